@@ -9,7 +9,8 @@ from alembic import context
 
 from app.core.database import Base
 from app.core.config import settings
-from app.models.webhook import WebhookEvent
+from app.models.payment import PaymentInitialization
+from app.models.webhook import WebhookEvent, WebhookEventKey
 
 config = context.config
 
@@ -20,7 +21,7 @@ target_metadata = Base.metadata
 
 def include_object(object, name, type_, reflected, compare_to):
     if type_ == "table":
-        our_tables = ["webhook_events"]
+        our_tables = ["webhook_events", "webhook_event_keys", "payment_initializations"]
         return name in our_tables
     return True
 
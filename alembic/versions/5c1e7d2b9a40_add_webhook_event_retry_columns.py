@@ -0,0 +1,46 @@
+"""add webhook_events retry columns
+
+Revision ID: 5c1e7d2b9a40
+Revises: a973ce311ce7
+Create Date: 2026-10-18 10:12:07.318214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7d2b9a40'
+down_revision: Union[str, None] = 'a973ce311ce7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('webhook_events', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('webhook_events', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('webhook_events', sa.Column('dead_lettered_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_webhook_events_retry_due',
+        'webhook_events',
+        ['next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text('processed = false AND dead_lettered_at IS NULL'),
+    )
+    op.create_index(
+        'ix_webhook_events_dead_lettered_at',
+        'webhook_events',
+        ['dead_lettered_at'],
+        unique=False,
+        postgresql_where=sa.text('dead_lettered_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_events_dead_lettered_at', table_name='webhook_events')
+    op.drop_index('ix_webhook_events_retry_due', table_name='webhook_events')
+    op.drop_column('webhook_events', 'dead_lettered_at')
+    op.drop_column('webhook_events', 'next_attempt_at')
+    op.drop_column('webhook_events', 'attempts')
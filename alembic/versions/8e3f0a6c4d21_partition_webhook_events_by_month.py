@@ -0,0 +1,144 @@
+"""partition webhook_events by month
+
+Revision ID: 8e3f0a6c4d21
+Revises: 5c1e7d2b9a40
+Create Date: 2026-10-18 12:31:54.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3f0a6c4d21'
+down_revision: Union[str, None] = '5c1e7d2b9a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions are created from the oldest existing row up to this many
+# months ahead; app/crud/webhook_event_partitions.py keeps creating them after.
+PREMAKE_MONTHS = 3
+
+
+def _create_indexes(event_id_unique: bool) -> None:
+    op.create_index(op.f('ix_webhook_events_event_id'), 'webhook_events', ['event_id'], unique=event_id_unique)
+    op.create_index(op.f('ix_webhook_events_medusa_order_id'), 'webhook_events', ['medusa_order_id'], unique=False)
+    op.create_index(op.f('ix_webhook_events_psp'), 'webhook_events', ['psp'], unique=False)
+    op.create_index(
+        'ix_webhook_events_retry_due',
+        'webhook_events',
+        ['next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text('processed = false AND dead_lettered_at IS NULL'),
+    )
+    op.create_index(
+        'ix_webhook_events_dead_lettered_at',
+        'webhook_events',
+        ['dead_lettered_at'],
+        unique=False,
+        postgresql_where=sa.text('dead_lettered_at IS NOT NULL'),
+    )
+
+
+def _drop_indexes() -> None:
+    op.drop_index('ix_webhook_events_dead_lettered_at', table_name='webhook_events')
+    op.drop_index('ix_webhook_events_retry_due', table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_psp'), table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_medusa_order_id'), table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_event_id'), table_name='webhook_events')
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column('id', sa.String(length=50), nullable=False),
+        sa.Column('event_id', sa.String(length=255), nullable=False),
+        sa.Column('psp', sa.String(length=50), nullable=False),
+        sa.Column('event_type', sa.String(length=100), nullable=False),
+        sa.Column('medusa_order_id', sa.String(length=255), nullable=True),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('processed', sa.Boolean(), nullable=False),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('dead_lettered_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def _copy_rows(source: str, target: str) -> None:
+    columns = ', '.join(column.name for column in _columns())
+    op.execute(f'INSERT INTO {target} ({columns}) SELECT {columns} FROM {source}')
+
+
+def upgrade() -> None:
+    _drop_indexes()
+    op.rename_table('webhook_events', 'webhook_events_unpartitioned')
+    op.execute('ALTER TABLE webhook_events_unpartitioned RENAME CONSTRAINT webhook_events_pkey TO webhook_events_unpartitioned_pkey')
+
+    op.create_table('webhook_events',
+    *_columns(),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)',
+    )
+    op.execute('CREATE TABLE webhook_events_default PARTITION OF webhook_events DEFAULT')
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start timestamptz;
+        BEGIN
+            month_start := date_trunc('month', coalesce(
+                (SELECT min(created_at) FROM webhook_events_unpartitioned), now()
+            ) AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+            WHILE month_start < date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+                    + interval '{PREMAKE_MONTHS + 1} months' LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF webhook_events FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month_start AT TIME ZONE 'UTC', '"webhook_events_y"YYYY"m"MM'),
+                    month_start,
+                    month_start + interval '1 month'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END
+        $$
+    """)
+    _create_indexes(event_id_unique=False)
+
+    op.create_table('webhook_event_keys',
+    sa.Column('event_id', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_index(op.f('ix_webhook_event_keys_created_at'), 'webhook_event_keys', ['created_at'], unique=False)
+
+    _copy_rows('webhook_events_unpartitioned', 'webhook_events')
+    op.execute('INSERT INTO webhook_event_keys (event_id, created_at) SELECT event_id, created_at FROM webhook_events_unpartitioned')
+    op.drop_table('webhook_events_unpartitioned')
+
+
+def downgrade() -> None:
+    op.rename_table('webhook_events', 'webhook_events_partitioned')
+    for index in (
+        'ix_webhook_events_dead_lettered_at',
+        'ix_webhook_events_retry_due',
+        'ix_webhook_events_psp',
+        'ix_webhook_events_medusa_order_id',
+        'ix_webhook_events_event_id',
+    ):
+        op.execute(f'ALTER INDEX {index} RENAME TO {index}_partitioned')
+    op.execute('ALTER TABLE webhook_events_partitioned RENAME CONSTRAINT webhook_events_pkey TO webhook_events_partitioned_pkey')
+
+    op.create_table('webhook_events',
+    *_columns(),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _copy_rows('webhook_events_partitioned', 'webhook_events')
+    _create_indexes(event_id_unique=True)
+
+    op.drop_table('webhook_events_partitioned')
+    op.drop_index(op.f('ix_webhook_event_keys_created_at'), table_name='webhook_event_keys')
+    op.drop_table('webhook_event_keys')
@@ -0,0 +1,53 @@
+"""add webhook_events query indexes
+
+Revision ID: c47d9e15b3f8
+Revises: 8e3f0a6c4d21
+Create Date: 2026-10-18 13:05:22.640913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47d9e15b3f8'
+down_revision: Union[str, None] = '8e3f0a6c4d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_webhook_events_created_at_id', 'webhook_events', ['created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_webhook_events_order_timeline',
+        'webhook_events',
+        ['medusa_order_id', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_webhook_events_psp_event_type_created_at',
+        'webhook_events',
+        ['psp', 'event_type', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_webhook_events_unprocessed',
+        'webhook_events',
+        ['created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text('processed = false'),
+    )
+    # Both are left prefixes of the composite indexes above
+    op.drop_index(op.f('ix_webhook_events_psp'), table_name='webhook_events')
+    op.drop_index(op.f('ix_webhook_events_medusa_order_id'), table_name='webhook_events')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_webhook_events_medusa_order_id'), 'webhook_events', ['medusa_order_id'], unique=False)
+    op.create_index(op.f('ix_webhook_events_psp'), 'webhook_events', ['psp'], unique=False)
+    op.drop_index('ix_webhook_events_unprocessed', table_name='webhook_events')
+    op.drop_index('ix_webhook_events_psp_event_type_created_at', table_name='webhook_events')
+    op.drop_index('ix_webhook_events_order_timeline', table_name='webhook_events')
+    op.drop_index('ix_webhook_events_created_at_id', table_name='webhook_events')
@@ -0,0 +1,43 @@
+"""create payment_initializations
+
+Revision ID: e9b2c6a71f05
+Revises: c47d9e15b3f8
+Create Date: 2026-10-18 14:02:37.115480
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b2c6a71f05'
+down_revision: Union[str, None] = 'c47d9e15b3f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('payment_initializations',
+    sa.Column('order_id', sa.String(length=255), nullable=False),
+    sa.Column('psp', sa.String(length=50), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('last_checked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('order_id')
+    )
+    op.create_index(
+        'ix_payment_initializations_unresolved',
+        'payment_initializations',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text('resolved_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payment_initializations_unresolved', table_name='payment_initializations')
+    op.drop_table('payment_initializations')
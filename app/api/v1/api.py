@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import webhooks, payments
+from app.api.v1.endpoints import admin, webhooks, payments
 
 api_router = APIRouter()
 
@@ -15,3 +15,9 @@ api_router.include_router(
     prefix="/payments", 
     tags=["payments"]
 )
+
+api_router.include_router(
+    admin.router, 
+    prefix="/admin", 
+    tags=["admin"]
+)
@@ -0,0 +1,62 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db_session
+from app.core.security import require_admin_key
+from app.crud import webhook_events as webhook_events_crud
+from app.schemas.common import GenericApiResponse
+from app.schemas.webhook import WebhookEventListResponse, WebhookEventRedriveRequest
+
+logger = logging.getLogger(__name__)
+
+
+router = APIRouter(default_response_class=ORJSONResponse, dependencies=[Depends(require_admin_key)])
+
+@router.get("/webhook-events/dead-letters")
+async def list_dead_letters(
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    db: AsyncSession = Depends(get_db_session),
+) -> GenericApiResponse:
+    webhook_events, count = await webhook_events_crud.list_dead_letter_webhook_events(db, limit, offset)
+    return GenericApiResponse(
+        success=True,
+        message=f"{count} dead-lettered webhook events",
+        data=WebhookEventListResponse(items=webhook_events, count=count).model_dump()
+    )
+
+@router.post("/webhook-events/dead-letters/redrive")
+async def redrive_dead_letters(
+    payload: WebhookEventRedriveRequest,
+    db: AsyncSession = Depends(get_db_session),
+) -> GenericApiResponse:
+    webhook_events = await webhook_events_crud.redrive_webhook_events(
+        db, payload.event_ids, min(payload.limit, 500)
+    )
+    logger.info(f"Re-drove {len(webhook_events)} dead-lettered webhook events")
+    return GenericApiResponse(
+        success=True,
+        message=f"{len(webhook_events)} webhook events scheduled for retry",
+        data=WebhookEventListResponse(items=webhook_events, count=len(webhook_events)).model_dump()
+    )
+
+@router.post("/webhook-events/{event_id}/redrive")
+async def redrive_dead_letter(
+    event_id: str,
+    db: AsyncSession = Depends(get_db_session),
+) -> GenericApiResponse:
+    webhook_events = await webhook_events_crud.redrive_webhook_events(db, [event_id], 1)
+    if not webhook_events:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No dead-lettered webhook event {event_id}"
+        )
+    logger.info(f"Re-drove dead-lettered webhook event {event_id}")
+    return GenericApiResponse(
+        success=True,
+        message="Webhook event scheduled for retry",
+        data=webhook_events[0].model_dump()
+    )
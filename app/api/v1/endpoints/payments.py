@@ -1,26 +1,43 @@
 
 import logging
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Response, status
+from pydantic import ValidationError
+from fastapi.responses import ORJSONResponse
 
-from app.schemas.payment import PaymentInitializeRequest, PaymentInitializeResponse
-from app.schemas.common import GenericApiResponse
+from app.core.config import settings
+from app.core.responses import model_response
+from app.schemas.payment import (
+    PaymentInitializeBatchEnvelope,
+    PaymentInitializeBatchItemResponse,
+    PaymentInitializeBatchRequest,
+    PaymentInitializeBatchResponse,
+    PaymentInitializeEnvelope,
+    PaymentInitializeRequest,
+    PaymentInitializeResponse,
+)
+from app.services.medusa_service import medusa_service
 from app.services.solidgate_service import solidgate_service
+from app.services.solidgate_status_poller import solidgate_status_poller
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-@router.post("/initialize", status_code=status.HTTP_200_OK)
-async def initialize_payment(payload: PaymentInitializeRequest) -> GenericApiResponse:
+@router.post("/initialize", status_code=status.HTTP_200_OK, response_model=PaymentInitializeEnvelope)
+async def initialize_payment(
+    payload: PaymentInitializeRequest,
+    background_tasks: BackgroundTasks,
+) -> Response:
     try:
-        result = solidgate_service.create_payment_intent(
+        result = await solidgate_service.get_or_create_payment_intent(
             order_id=payload.order_id,
             amount=payload.amount,
             currency=payload.currency,
             customer_email=payload.customer_email,
         )
-        response_data = PaymentInitializeResponse(
+        # Built from already validated values, so construct without validating
+        response_data = PaymentInitializeResponse.model_construct(
             session_id=payload.order_id,
             psp=payload.psp,
             merchant=result["merchant"],
@@ -28,18 +45,109 @@ async def initialize_payment(payload: PaymentInitializeRequest) -> GenericApiRes
             payment_intent=result["payment_intent"],
         )
 
-        print(f"response_data: {response_data}")
+        logger.debug(f"response_data: {response_data}")
+
+        if settings.MEDUSA_PAYMENT_PREFETCH:
+            background_tasks.add_task(medusa_service.prefetch_payment, payload.order_id)
+
+        if solidgate_status_poller.enabled:
+            background_tasks.add_task(solidgate_status_poller.record_initializations, [{
+                "order_id": payload.order_id,
+                "psp": payload.psp,
+                "amount": payload.amount,
+                "currency": payload.currency,
+            }])
         
-        return GenericApiResponse(
+        return model_response(PaymentInitializeEnvelope(
             success=True,
             message="Payment intent created successfully",
-            data=response_data.model_dump()
-        )
+            data=response_data
+        ))
         
     except Exception as e:
         logger.error(f"Payment initialization failed: {e}")
-        return GenericApiResponse(
+        return model_response(PaymentInitializeEnvelope(
             success=False,
             message="Failed to initialize payment",
             data=None
-        )
\ No newline at end of file
+        ))
+
+
+@router.post("/initialize/batch", status_code=status.HTTP_200_OK, response_model=PaymentInitializeBatchEnvelope)
+async def initialize_payment_batch(
+    payload: PaymentInitializeBatchRequest,
+    background_tasks: BackgroundTasks,
+) -> Response:
+    if not payload.items or len(payload.items) > settings.PAYMENT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"items must contain between 1 and {settings.PAYMENT_BATCH_MAX_ITEMS} entries"
+        )
+
+    results: list[PaymentInitializeBatchItemResponse | None] = [None] * len(payload.items)
+    valid_items: list[tuple[int, PaymentInitializeRequest]] = []
+    for index, raw_item in enumerate(payload.items):
+        try:
+            valid_items.append((index, PaymentInitializeRequest.model_validate(raw_item)))
+        except ValidationError as e:
+            results[index] = PaymentInitializeBatchItemResponse(
+                index=index,
+                order_id=raw_item.get("order_id") if isinstance(raw_item.get("order_id"), str) else None,
+                success=False,
+                message="; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in e.errors()
+                ),
+            )
+
+    intents = await solidgate_service.create_payment_intents([item for _, item in valid_items])
+
+    for (index, item), intent in zip(valid_items, intents):
+        if isinstance(intent, Exception):
+            logger.error(f"Payment initialization failed for order {item.order_id}: {intent}")
+            results[index] = PaymentInitializeBatchItemResponse(
+                index=index,
+                order_id=item.order_id,
+                success=False,
+                message="Failed to initialize payment",
+            )
+            continue
+
+        results[index] = PaymentInitializeBatchItemResponse(
+            index=index,
+            order_id=item.order_id,
+            success=True,
+            message="Payment intent created successfully",
+            data=PaymentInitializeResponse.model_construct(
+                session_id=item.order_id,
+                psp=item.psp,
+                merchant=intent["merchant"],
+                signature=intent["signature"],
+                payment_intent=intent["payment_intent"],
+            ),
+        )
+        if settings.MEDUSA_PAYMENT_PREFETCH:
+            background_tasks.add_task(medusa_service.prefetch_payment, item.order_id)
+
+    if solidgate_status_poller.enabled:
+        initialized = [
+            {"order_id": item.order_id, "psp": item.psp, "amount": item.amount, "currency": item.currency}
+            for (index, item) in valid_items
+            if results[index].success
+        ]
+        if initialized:
+            background_tasks.add_task(solidgate_status_poller.record_initializations, initialized)
+
+    succeeded = sum(1 for result in results if result.success)
+    batch = PaymentInitializeBatchResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
+
+    return model_response(PaymentInitializeBatchEnvelope(
+        success=batch.failed == 0,
+        message=f"{succeeded}/{len(results)} payment intents created",
+        data=batch
+    ))
\ No newline at end of file
@@ -1,85 +1,200 @@
+import base64
 import logging
 from datetime import datetime
+
+import orjson
 from app.core.database import get_db_session
 from sqlalchemy.orm import Session
 
-from fastapi import APIRouter, Header, HTTPException, Request, status, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Query, Request, status, Depends
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
 
-from app.core.database import AsyncSessionLocal
-from app.models.webhook import WebhookEvent
+from app.core.config import settings
+from app.core.logging_config import event_id_var
+from app.core.metrics import WEBHOOK_EVENTS, WEBHOOK_RESULTS, observe_stage
+from app.core.responses import api_response, model_response, raw_json
+from app.core.security import require_admin_key
+from app.crud import webhook_events as webhook_events_crud
 from app.schemas.common import GenericApiResponse
 from app.services.idempotency_service import idempotency_service
 from app.services.solidgate_service import solidgate_service
-from app.services.medusa_service import medusa_service
+from app.services.webhook_queue_service import webhook_queue_service
+from app.services.webhook_retry_service import process_webhook_event, webhook_retry_service
 
-from app.schemas.webhook import WebhookEventCreate, WebhookEventResponse
+from app.schemas.webhook import WebhookEventCreate, WebhookEventPage, WebhookEventResponse
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 @router.post('/solidgate_webhook')
 async def solidgate_webhook(request: Request, db: Session = Depends(get_db_session)):
+    raw_body = await request.body()
+
+    with observe_stage("signature"):
+        signature_valid = not settings.SOLIDGATE_WEBHOOK_VERIFY_SIGNATURE or solidgate_service.verify_webhook_signature(
+            raw_body, request.headers.get("signature", "")
+        )
+    if not signature_valid:
+        WEBHOOK_RESULTS.labels("solidgate", "invalid_signature").inc()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid signature"
+        )
+
+    event_id = request.headers.get("solidgate-event-id")
+    event_type = request.headers.get("solidgate-event-type")
+    if not event_id or not event_type:
+        WEBHOOK_RESULTS.labels("solidgate", "invalid_headers").inc()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Missing solidgate-event-id or solidgate-event-type header"
+        )
+
     try:
-        body = await request.json()
-
-        print("=" * 80)
-        print("=" * 80)
-        print("=" * 80)
-        print("")
-        print("")
-        print(body)
-        print("")
-        print("")
-        print("=" * 80)
-        print("=" * 80)
-        print("=" * 80)
-        print(f"request.headers.get(solidgate-event-type): {request.headers.get("solidgate-event-type")}")
-        print(f"request.headers.get(solidgate-event-id): {request.headers.get("solidgate-event-id")}")
-        print("=" * 80)
-        print("=" * 80)
-
-        order = body.get("order", {})
-        order_id = order.get("order_id", "")
-        order_status = order.get("status", "")
+        with observe_stage("parse"):
+            webhook = solidgate_service.parse_webhook(raw_body)
+    except ValidationError as e:
+        WEBHOOK_RESULTS.labels("solidgate", "invalid_payload").inc()
+        invalid_json = any(error["type"] == "json_invalid" for error in e.errors())
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid JSON payload" if invalid_json else "Invalid webhook payload"
+        )
+    # Stored and echoed as the original bytes; only the routing fields were parsed
+    payload = raw_json(raw_body)
+
+    try:
+        event_id_var.set(event_id)
+        logger.debug(
+            "Solidgate webhook received",
+            extra={"event_type": event_type, "payload": payload},
+        )
+
+        order_id = webhook.order_id
+        order_status = webhook.order_status
+        needs_processing = order_status == "settle_ok"
+        echo = payload if settings.WEBHOOK_ECHO_PAYLOAD else None
+        queued = settings.webhook_queue_enabled and needs_processing
+        WEBHOOK_EVENTS.labels("solidgate", event_type, order_status).inc()
 
         idempotency = await idempotency_service.create_webhook_event(db, WebhookEventCreate(
             psp="solidgate",
-            event_type=request.headers.get("solidgate-event-type"),
-            event_id=request.headers.get("solidgate-event-id"),
+            event_type=event_type,
+            event_id=event_id,
             medusa_order_id=order_id,
-            processed=True,
-            payload=body,
+            processed=not needs_processing,
+            payload=payload,
+            next_attempt_at=webhook_retry_service.lease_deadline(queued) if needs_processing else None,
         ))
 
         if not idempotency:
-            logger.error(f"Webhook event log already exists for idempotency key: {request.headers.get('solidgate-event-id')}")
-            return {"message": "Webhook event log already exists", "received": body}
+            WEBHOOK_RESULTS.labels("solidgate", "duplicate").inc()
+            logger.error(f"Webhook event log already exists for idempotency key: {event_id}")
+            return api_response(
+                success=True,
+                message="Webhook event log already exists",
+                data=echo
+            )
+
+        if queued:
+            if await webhook_queue_service.enqueue(event_id, order_id, order_status):
+                WEBHOOK_RESULTS.labels("solidgate", "queued").inc()
+                return api_response(
+                    success=True,
+                    message="solidgate_webhook queued",
+                    status_code=status.HTTP_202_ACCEPTED,
+                    data=echo
+                )
+            logger.warning(f"Webhook queue unavailable, processing {event_id} inline")
 
-        if order_status == "settle_ok":
-            result = await medusa_service.process_settle_ok(order_id)
+        if needs_processing:
+            error_message = None
+            try:
+                with observe_stage("process_settle_ok"):
+                    result = await process_webhook_event(order_id, order_status)
+                if not result:
+                    error_message = f"Processing failed for order {order_id}"
+            except Exception as e:
+                error_message = str(e)
 
-            if not result:
+            if error_message:
+                WEBHOOK_RESULTS.labels("solidgate", "failed").inc()
+                await webhook_retry_service.record_failure(event_id, error_message, db)
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="An unexpected error occurred"
                 )
 
-            return result
+            await webhook_retry_service.record_success(event_id, db)
+
+            WEBHOOK_RESULTS.labels("solidgate", "processed").inc()
+            return model_response(result)
         
-        return GenericApiResponse(
+        WEBHOOK_RESULTS.labels("solidgate", "logged").inc()
+        return api_response(
             success=True,
             message="solidgate_webhook call success", 
             status_code=status.HTTP_201_CREATED,
-            data=body
+            data=echo
         )
     
     except Exception as e:
-        logger.error(f"Webhook error: {e}")  # ✅ Now you can see real error
-        import traceback
-        traceback.print_exc()  # ✅ Full traceback
+        logger.exception(f"Webhook error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred"
-        )
\ No newline at end of file
+        )
+
+
+def _encode_cursor(webhook_event: WebhookEventResponse) -> str:
+    raw = orjson.dumps([webhook_event.created_at.isoformat(), webhook_event.id])
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, event_row_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(event_row_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+@router.get('/events', dependencies=[Depends(require_admin_key)])
+async def list_webhook_events(
+    psp: str | None = None,
+    event_type: str | None = None,
+    medusa_order_id: str | None = None,
+    processed: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    include_payload: bool = False,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    db: Session = Depends(get_db_session),
+):
+    webhook_events = await webhook_events_crud.list_webhook_events(
+        db,
+        limit=limit + 1,
+        psp=psp,
+        event_type=event_type,
+        medusa_order_id=medusa_order_id,
+        processed=processed,
+        created_from=created_from,
+        created_to=created_to,
+        after=_decode_cursor(cursor) if cursor else None,
+        include_payload=include_payload,
+    )
+    has_more = len(webhook_events) > limit
+    webhook_events = webhook_events[:limit]
+
+    return GenericApiResponse(
+        success=True,
+        message=f"{len(webhook_events)} webhook events",
+        data=WebhookEventPage(
+            items=webhook_events,
+            next_cursor=_encode_cursor(webhook_events[-1]) if has_more else None,
+        ).model_dump()
+    )
@@ -1,4 +1,4 @@
-from pydantic import Field, field_validator
+from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,6 +8,7 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     
     DATABASE_URL: str
+    DB_POOL_MODE: str = "null"
     DB_POOL_SIZE: int = 3
     DB_MAX_OVERFLOW: int = 2
     DB_POOL_TIMEOUT: int = 30
@@ -19,6 +20,15 @@ class Settings(BaseSettings):
     SOLIDGATE_API_URL: str = "https://pay.solidgate.com/api/v1"
     SOLIDGATE_SUCCESS_URL: str = "https://merchant.example/success"
     SOLIDGATE_FAIL_URL: str = "https://merchant.example/fail"
+    SOLIDGATE_WEBHOOK_PUBLIC_KEY: str | None = None
+    SOLIDGATE_WEBHOOK_SECRET_KEY: str | None = None
+    # Defaults to on exactly when both webhook keys are configured; production
+    # refuses to start without them unless this is explicitly false
+    SOLIDGATE_WEBHOOK_VERIFY_SIGNATURE: bool | None = None
+    
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLE_RATES: dict[str, float] = {}
     
     SECRET_KEY: str = "change-this-in-production-use-secrets-generate-32"
     ALLOWED_HOSTS: str = "localhost,127.0.0.1"
@@ -27,11 +37,106 @@ class Settings(BaseSettings):
     
     REDIS_URL: str 
     REDIS_PASSWORD: str 
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    REDIS_RECONNECT_MAX_DELAY: float = 30.0
+    REDIS_LOCAL_CACHE_TTL: int = 30
+    REDIS_LOCAL_CACHE_MAX_SIZE: int = 10000
 
     MEDUSA_BASE_URL: str = "http://localhost:9000"
     MEDUSA_ADMIN_EMAIL: str 
     MEDUSA_ADMIN_PASSWORD: str
     MEDUSA_TOKEN_CACHE_TTL: int = 82800
+    MEDUSA_TOKEN_REFRESH_MARGIN: int = 600
+    MEDUSA_PAYMENT_PREFETCH: bool = True
+    MEDUSA_PAYMENT_CACHE_TTL: int = 86400
+    MEDUSA_BREAKER_FAILURE_RATE: float = 0.5
+    MEDUSA_BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    MEDUSA_BREAKER_SLOW_CALL_RATE: float = 0.8
+    MEDUSA_BREAKER_WINDOW: int = 50
+    MEDUSA_BREAKER_MIN_CALLS: int = 10
+    MEDUSA_BREAKER_OPEN_SECONDS: float = 15.0
+    MEDUSA_BREAKER_HALF_OPEN_CALLS: int = 3
+    MEDUSA_CONCURRENCY_INITIAL: int = 20
+    MEDUSA_CONCURRENCY_MIN: int = 2
+    MEDUSA_CONCURRENCY_MAX: int = 100
+    MEDUSA_CONCURRENCY_LATENCY_TARGET: float = 1.0
+    MEDUSA_CONCURRENCY_QUEUE_TIMEOUT: float = 5.0
+    MEDUSA_HTTP_MAX_CONNECTIONS: int = 20
+    MEDUSA_HTTP_MAX_KEEPALIVE: int = 10
+    MEDUSA_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    MEDUSA_HTTP_TIMEOUT: float = 30.0
+    MEDUSA_HTTP_CONNECT_TIMEOUT: float = 5.0
+    MEDUSA_HTTP_POOL_TIMEOUT: float = 5.0
+    MEDUSA_HTTP2: bool = False
+
+    PAYMENT_INTENT_CACHE_TTL: int = 900
+    PAYMENT_INTENT_CACHE_MAX_SIZE: int = 10000
+    PAYMENT_INTENT_CACHE_REDIS: bool = False
+    PAYMENT_BATCH_MAX_ITEMS: int = 500
+    PAYMENT_BATCH_WORKERS: int = 4
+
+    SOLIDGATE_HTTP_MAX_CONNECTIONS: int = 20
+    SOLIDGATE_HTTP_MAX_KEEPALIVE: int = 10
+    SOLIDGATE_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    SOLIDGATE_HTTP_TIMEOUT: float = 30.0
+    SOLIDGATE_HTTP_CONNECT_TIMEOUT: float = 5.0
+    SOLIDGATE_HTTP_POOL_TIMEOUT: float = 5.0
+    SOLIDGATE_HTTP2: bool = True
+
+    WEBHOOK_ECHO_PAYLOAD: bool = True
+    WEBHOOK_EVENT_BATCHING: bool = False
+    WEBHOOK_EVENT_BATCH_MAX_SIZE: int = 100
+    WEBHOOK_EVENT_BATCH_MAX_WAIT_MS: int = 5
+
+    WEBHOOK_PROCESSING_MODE: str = "inline"
+    WEBHOOK_QUEUE_STREAM: str = "webhooks:solidgate"
+    WEBHOOK_QUEUE_GROUP: str = "webhook-workers"
+    WEBHOOK_QUEUE_MAXLEN: int = 100000
+    WEBHOOK_QUEUE_VISIBILITY_TIMEOUT: int = 120
+    WEBHOOK_QUEUE_MAX_DELIVERIES: int = 5
+    WEBHOOK_QUEUE_BLOCK_MS: int = 5000
+    WEBHOOK_WORKER_CONCURRENCY: int = 4
+    WEBHOOK_ORDER_LANES: int = 32
+    WEBHOOK_ORDER_LANE_QUEUE_SIZE: int = 1000
+    WEBHOOK_ORDER_LANE_SHUTDOWN_TIMEOUT: float = 10.0
+    WEBHOOK_RETRY_ENABLED: bool = True
+    WEBHOOK_RETRY_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BASE_DELAY: float = 30.0
+    WEBHOOK_RETRY_MAX_DELAY: float = 3600.0
+    WEBHOOK_RETRY_LEASE: int = 300
+    WEBHOOK_RETRY_POLL_INTERVAL: float = 5.0
+    WEBHOOK_RETRY_BATCH_SIZE: int = 100
+    WEBHOOK_RETRY_CONCURRENCY: int = 10
+
+    WEBHOOK_PARTITION_PREMAKE_MONTHS: int = 3
+    WEBHOOK_RETENTION_MONTHS: int = 0
+    WEBHOOK_ARCHIVE_DIR: str | None = None
+    WEBHOOK_MAINTENANCE_INTERVAL: int = 3600
+
+    CAPTURE_RECONCILE_INTERVAL: int = 0
+    CAPTURE_RECONCILE_LOOKBACK_DAYS: int = 30
+    CAPTURE_RECONCILE_MIN_AGE: int = 900
+    CAPTURE_RECONCILE_MAX_ORDERS: int = 5000
+    CAPTURE_RECONCILE_BATCH_SIZE: int = 100
+    CAPTURE_RECONCILE_CONCURRENCY: int = 10
+
+    SOLIDGATE_STATUS_POLL_INTERVAL: int = 0
+    SOLIDGATE_STATUS_POLL_MIN_AGE: int = 900
+    SOLIDGATE_STATUS_POLL_LOOKBACK_HOURS: int = 72
+    SOLIDGATE_STATUS_POLL_RECHECK: int = 1800
+    SOLIDGATE_STATUS_POLL_PAGE_SIZE: int = 1000
+    SOLIDGATE_STATUS_POLL_MAX_ORDERS: int = 50000
+    SOLIDGATE_STATUS_POLL_WORKERS: int = 20
+    SOLIDGATE_STATUS_RATE_LIMIT: float = 20.0
+    SOLIDGATE_STATUS_RATE_BURST: int = 20
+    SOLIDGATE_STATUS_RETRY_AFTER: float = 30.0
+
+    READINESS_REFRESH_INTERVAL: float = 5.0
+    READINESS_CHECK_TIMEOUT: float = 2.0
+    READINESS_STALE_AFTER: float = 30.0
+
+    ADMIN_API_KEY: str | None = None
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -54,6 +159,10 @@ class Settings(BaseSettings):
     def is_development(self) -> bool:
         return self.ENVIRONMENT.lower() == "development"
     
+    @property
+    def webhook_queue_enabled(self) -> bool:
+        return self.WEBHOOK_PROCESSING_MODE == "queue"
+    
     @property
     def database_url_sync(self) -> str:
         return self.DATABASE_URL.replace("+asyncpg", "")
@@ -72,5 +181,46 @@ class Settings(BaseSettings):
         if v.lower() not in allowed:
             raise ValueError(f"ENVIRONMENT must be one of: {allowed}")
         return v.lower()
+    
+    @field_validator("DB_POOL_MODE")
+    @classmethod
+    def validate_db_pool_mode(cls, v: str) -> str:
+        allowed = ["null", "queue"]
+        if v.lower() not in allowed:
+            raise ValueError(f"DB_POOL_MODE must be one of: {allowed}")
+        return v.lower()
+    
+    @field_validator("LOG_FORMAT")
+    @classmethod
+    def validate_log_format(cls, v: str) -> str:
+        allowed = ["json", "text"]
+        if v.lower() not in allowed:
+            raise ValueError(f"LOG_FORMAT must be one of: {allowed}")
+        return v.lower()
+    
+    @field_validator("WEBHOOK_PROCESSING_MODE")
+    @classmethod
+    def validate_webhook_processing_mode(cls, v: str) -> str:
+        allowed = ["inline", "queue"]
+        if v.lower() not in allowed:
+            raise ValueError(f"WEBHOOK_PROCESSING_MODE must be one of: {allowed}")
+        return v.lower()
+    
+    @model_validator(mode="after")
+    def validate_webhook_signature_keys(self) -> "Settings":
+        keys_configured = bool(self.SOLIDGATE_WEBHOOK_PUBLIC_KEY and self.SOLIDGATE_WEBHOOK_SECRET_KEY)
+        if self.SOLIDGATE_WEBHOOK_VERIFY_SIGNATURE is None:
+            if self.is_production and not keys_configured:
+                raise ValueError(
+                    "Production requires SOLIDGATE_WEBHOOK_PUBLIC_KEY and SOLIDGATE_WEBHOOK_SECRET_KEY, "
+                    "or an explicit SOLIDGATE_WEBHOOK_VERIFY_SIGNATURE=false"
+                )
+            self.SOLIDGATE_WEBHOOK_VERIFY_SIGNATURE = keys_configured
+        elif self.SOLIDGATE_WEBHOOK_VERIFY_SIGNATURE and not keys_configured:
+            raise ValueError(
+                "SOLIDGATE_WEBHOOK_VERIFY_SIGNATURE requires SOLIDGATE_WEBHOOK_PUBLIC_KEY "
+                "and SOLIDGATE_WEBHOOK_SECRET_KEY"
+            )
+        return self
 
 settings = Settings()
\ No newline at end of file
@@ -1,6 +1,10 @@
+import asyncio
+import logging
+import time
 from typing import AsyncGenerator
 from uuid import uuid4
-from sqlalchemy.pool import NullPool
+import orjson
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -12,49 +16,120 @@ from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import text
 
 from app.core.config import settings
+from app.core.metrics import DB_SESSIONS
+
+logger = logging.getLogger(__name__)
 
 class Base(DeclarativeBase):
     pass
 
-# engine: AsyncEngine = create_async_engine(
-#     url=settings.DATABASE_URL,
-#     pool_size=settings.DB_POOL_SIZE,
-#     max_overflow=settings.DB_MAX_OVERFLOW,
-#     pool_pre_ping=True,
-#     echo=settings.DB_ECHO,
-#     pool_recycle=settings.DB_POOL_RECYCLE,
-#     connect_args={
-#         "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
-#         "statement_cache_size": 0,
-#         "prepared_statement_cache_size": 0,
-#     },
-# )
-engine: AsyncEngine = create_async_engine(
-    url=settings.DATABASE_URL,
-    poolclass=NullPool,
-    echo=settings.DB_ECHO,
-    connect_args={
-        "statement_cache_size": 0,
-        "prepared_statement_cache_size": 0,
-        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",  
-    },
-)
+class _CheckoutTimingMixin:
+    checkout_count = 0
+    checkout_total_seconds = 0.0
+    checkout_max_seconds = 0.0
+    in_use = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        connection = super()._do_get()
+        elapsed = time.perf_counter() - start
+        self.in_use += 1
+        self.checkout_count += 1
+        self.checkout_total_seconds += elapsed
+        self.checkout_max_seconds = max(self.checkout_max_seconds, elapsed)
+        return connection
+
+    def _do_return_conn(self, record):
+        self.in_use -= 1
+        super()._do_return_conn(record)
+
+
+class TimedNullPool(_CheckoutTimingMixin, NullPool):
+    pass
+
+
+class TimedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+connect_args = {
+    "statement_cache_size": 0,
+    "prepared_statement_cache_size": 0,
+    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+}
+
+_engine: AsyncEngine | None = None
+
+
+def _serialize_json(value) -> str:
+    # orjson embeds pre-encoded payloads (orjson.Fragment) without re-encoding
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
+def _create_engine() -> AsyncEngine:
+    if settings.DB_POOL_MODE == "queue":
+        return create_async_engine(
+            url=settings.DATABASE_URL,
+            poolclass=TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+            echo=settings.DB_ECHO,
+            connect_args=connect_args,
+            json_serializer=_serialize_json,
+        )
+    return create_async_engine(
+        url=settings.DATABASE_URL,
+        poolclass=TimedNullPool,
+        echo=settings.DB_ECHO,
+        connect_args=connect_args,
+        json_serializer=_serialize_json,
+    )
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Creates the engine on first use rather than at import, so importing the
+    app or the models (alembic, CLI entry points) does not load the asyncpg
+    dialect. The app's lifespan creates it before serving.
+    """
+    global _engine
+    if _engine is None:
+        _engine = _create_engine()
+    return _engine
+
+
+async def dispose_engine() -> None:
+    if _engine is not None:
+        await _engine.dispose()
+
+
+class _LazySessionMaker(async_sessionmaker):
+    def __call__(self, **local_kw) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+AsyncSessionLocal = _LazySessionMaker(
     class_=AsyncSession,
     expire_on_commit=False,
 )
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     session = AsyncSessionLocal()
+    DB_SESSIONS.inc()
     try:
         yield session
-        await session.commit()
+        if session.in_transaction():
+            await session.commit()
     except Exception:
         await session.rollback()
         raise
     finally:
+        DB_SESSIONS.dec()
         await session.close()
 
 
@@ -65,15 +140,55 @@ async def check_db_health() -> dict | None:
         version = result.scalar()
         return {"status": "healthy", "version": version}
     except Exception as e:
-        print(f"Database health check failed: {e}")
+        logger.error(f"Database health check failed: {e}")
         return False 
     finally:
         await session.close()
+
+
+async def warm_up_pool() -> None:
+    if settings.DB_POOL_MODE != "queue":
+        return
+
+    engine = get_engine()
+
+    async def _open():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    results = await asyncio.gather(
+        *(_open() for _ in range(settings.DB_POOL_SIZE)),
+        return_exceptions=True,
+    )
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        logger.error(f"Database pool warm-up failed for {len(failures)} connections: {failures[0]}")
+
+
+def db_pool_stats() -> dict:
+    pool = get_engine().pool
+    checkout_count = pool.checkout_count
+    stats = {
+        "mode": settings.DB_POOL_MODE,
+        "in_use": pool.in_use,
+        "checkouts": checkout_count,
+        "checkout_avg_ms": round(pool.checkout_total_seconds / checkout_count * 1000, 3) if checkout_count else 0.0,
+        "checkout_max_ms": round(pool.checkout_max_seconds * 1000, 3),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        checked_out = pool.checkedout()
+        stats.update({
+            "size": pool.size(),
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+        })
+    return stats
     
 
 if __name__ == "__main__":
-    import asyncio
-
     async def test():
         print("Testing DB connection")
 
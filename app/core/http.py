@@ -0,0 +1,135 @@
+import logging
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    """
+    Counts requests from the moment they ask the pool for a connection until
+    their response is closed, through httpx's public transport interface
+    only. Anything above max_connections is waiting for a connection; with
+    HTTP/2 requests share connections, so that figure is an upper bound.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_connections: int):
+        self._transport = transport
+        self.max_connections = max_connections
+        self.in_flight = 0
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+        released = False
+
+        def release_once() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._release()
+
+        response.stream = _ReleasingStream(response.stream, release_once)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": max(0, self.in_flight - self.max_connections),
+            "max_connections": self.max_connections,
+        }
+
+
+class HttpClientPool:
+    """
+    Long-lived pooled httpx clients, one per upstream.
+
+    Clients are opened in the app lifespan and reused by every request so
+    keep-alive connections (and their TLS sessions) survive across webhooks.
+    Accessing a client outside the lifespan (scripts, tests) opens it lazily.
+    """
+
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._transports: dict[str, CountingTransport] = {}
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        prefix = name.upper()
+        limits = httpx.Limits(
+            max_connections=getattr(settings, f"{prefix}_HTTP_MAX_CONNECTIONS"),
+            max_keepalive_connections=getattr(settings, f"{prefix}_HTTP_MAX_KEEPALIVE"),
+            keepalive_expiry=getattr(settings, f"{prefix}_HTTP_KEEPALIVE_EXPIRY"),
+        )
+        timeout = httpx.Timeout(
+            getattr(settings, f"{prefix}_HTTP_TIMEOUT"),
+            connect=getattr(settings, f"{prefix}_HTTP_CONNECT_TIMEOUT"),
+            pool=getattr(settings, f"{prefix}_HTTP_POOL_TIMEOUT"),
+        )
+        http2 = getattr(settings, f"{prefix}_HTTP2")
+        transport = CountingTransport(
+            httpx.AsyncHTTPTransport(limits=limits, http2=http2),
+            max_connections=limits.max_connections,
+        )
+        self._transports[name] = transport
+        return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build(name)
+            self._clients[name] = client
+        return client
+
+    @property
+    def medusa(self) -> httpx.AsyncClient:
+        return self.get("medusa")
+
+    @property
+    def solidgate(self) -> httpx.AsyncClient:
+        return self.get("solidgate")
+
+    async def connect(self) -> None:
+        for name in ("medusa", "solidgate"):
+            self.get(name)
+        logger.info("HTTP client pools opened")
+
+    async def disconnect(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        self._transports.clear()
+        logger.info("HTTP client pools closed")
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {name: transport.stats() for name, transport in self._transports.items()}
+
+
+http_clients = HttpClientPool()
@@ -0,0 +1,164 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+STAGE_LATENCY = Histogram(
+    "webhook_stage_duration_seconds",
+    "Latency of each webhook pipeline stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+WEBHOOK_EVENTS = Counter(
+    "webhook_events_total",
+    "Webhook events received",
+    ["psp", "event_type", "order_status"],
+)
+WEBHOOK_RESULTS = Counter(
+    "webhook_results_total",
+    "Webhook outcomes",
+    ["psp", "result"],
+)
+IN_FLIGHT_REQUESTS = Gauge(
+    "http_requests_in_flight",
+    "Inbound HTTP requests currently being served",
+)
+DB_SESSIONS = Gauge(
+    "db_sessions_in_use",
+    "Request-scoped database sessions currently open",
+)
+OUTBOUND_IN_FLIGHT = Gauge(
+    "outbound_http_requests_in_flight",
+    "Outbound HTTP requests currently waiting on an upstream",
+    ["upstream"],
+)
+OUTBOUND_LATENCY = Histogram(
+    "outbound_http_request_duration_seconds",
+    "Latency of outbound HTTP requests",
+    ["upstream"],
+    buckets=LATENCY_BUCKETS,
+)
+
+REDIS_CACHE_REQUESTS = Counter(
+    "redis_cache_requests_total",
+    "Cache lookups by tier and result",
+    ["tier", "result"],
+)
+REDIS_FALLBACKS = Counter(
+    "redis_fallbacks_total",
+    "Redis operations served by the local tier or skipped because Redis was unavailable",
+    ["operation"],
+)
+REDIS_CONNECTED = Gauge(
+    "redis_connected",
+    "Whether the Redis connection is currently healthy",
+)
+SOLIDGATE_STATUS_POLLS = Counter(
+    "solidgate_status_polls_total",
+    "Solidgate order status checks made by the status poller",
+    ["result"],
+)
+ORDER_LANE_BACKLOG = Gauge(
+    "webhook_order_lane_backlog",
+    "Webhook events waiting on an order processing lane",
+)
+
+READINESS_CHECK_UP = Gauge(
+    "readiness_check_up",
+    "Result of the last background readiness check (1 ok, 0 failed)",
+    ["check"],
+)
+READINESS_CHECK_LATENCY = Gauge(
+    "readiness_check_duration_seconds",
+    "Latency of the last background readiness check",
+    ["check"],
+)
+
+UPSTREAM_CIRCUIT_STATE = Gauge(
+    "upstream_circuit_state",
+    "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open)",
+    ["upstream"],
+)
+UPSTREAM_CONCURRENCY_LIMIT = Gauge(
+    "upstream_concurrency_limit",
+    "Current adaptive concurrency limit per upstream",
+    ["upstream"],
+)
+UPSTREAM_REJECTIONS = Counter(
+    "upstream_rejections_total",
+    "Outbound calls rejected before reaching the upstream",
+    ["upstream", "reason"],
+)
+
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def track_outbound(upstream: str) -> Iterator[None]:
+    in_flight = OUTBOUND_IN_FLIGHT.labels(upstream)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        OUTBOUND_LATENCY.labels(upstream).observe(time.perf_counter() - start)
+        in_flight.dec()
+
+
+class PoolCollector:
+    """
+    Reads DB and HTTP pool statistics at scrape time, so they cost nothing
+    between scrapes.
+    """
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        from app.core.database import db_pool_stats
+        from app.core.http import http_clients
+
+        db_stats = db_pool_stats()
+        db_gauge = GaugeMetricFamily("db_pool", "Database connection pool statistics", labels=["stat"])
+        for stat, value in db_stats.items():
+            if isinstance(value, (int, float)):
+                db_gauge.add_metric([stat], value)
+        yield db_gauge
+
+        http_gauge = GaugeMetricFamily(
+            "http_client_pool_connections",
+            "Outbound HTTP client pool usage",
+            labels=["upstream", "state"],
+        )
+        for upstream, stats in http_clients.stats().items():
+            for state, value in stats.items():
+                http_gauge.add_metric([upstream, state], value)
+        yield http_gauge
+
+
+REGISTRY.register(PoolCollector())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,65 +1,340 @@
+import asyncio
 import logging
 
-from redis.asyncio import Redis
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ResponseError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import REDIS_CACHE_REQUESTS, REDIS_CONNECTED, REDIS_FALLBACKS
 
 logger = logging.getLogger(__name__)
 
 
 class RedisClient:
+    """
+    Redis with a bounded in-process LRU/TTL tier in front of it.
+
+    Reads check the local tier first and fill it from Redis. Writes go to
+    both; entries written through to Redis live locally for at most
+    REDIS_LOCAL_CACHE_TTL. Deletes are not propagated: delete() clears this
+    process and Redis, but other replicas keep serving their local copy until
+    it expires. Keys that must not be served stale after an invalidation pass
+    local=False, which reads and writes Redis only while it is reachable.
+    While Redis is unreachable, reads and writes are served by the local tier
+    alone (with the caller's full TTL) and a background task keeps
+    reconnecting, so losing Redis degrades caching to per-process instead of
+    sending every caller to the upstream.
+    """
+
     def __init__(self):
         self._client: Redis | None = None
+        self._healthy = False
+        self._reconnect_task: asyncio.Task | None = None
+        self.local_ttl = settings.REDIS_LOCAL_CACHE_TTL
+        self._local = TTLCache(max_size=settings.REDIS_LOCAL_CACHE_MAX_SIZE, ttl=self.local_ttl)
+
+    @property
+    def is_connected(self) -> bool:
+        return self._client is not None and self._healthy
 
     async def connect(self) -> None:
-        try:
-            self._client = Redis.from_url(
+        if self._client is None:
+            self._client = Redis(connection_pool=ConnectionPool.from_url(
                 settings.REDIS_URL,
+                password=settings.REDIS_PASSWORD or None,
                 decode_responses=True,
-            )
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                # Must outlast a blocking XREADGROUP on the webhook queue
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT + settings.WEBHOOK_QUEUE_BLOCK_MS / 1000,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                health_check_interval=30,
+            ))
+        try:
             await self._client.ping()
+            self._set_healthy(True)
             logger.info("Redis connected successfully")
         except Exception as e:
             logger.error(f"Redis connection failed: {e}")
-            self._client = None
+            self._set_healthy(False)
+            self._schedule_reconnect()
 
     async def disconnect(self) -> None:
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            await asyncio.gather(self._reconnect_task, return_exceptions=True)
+            self._reconnect_task = None
         if self._client:
-            await self._client.close()
+            await self._client.aclose()
+            self._client = None
+            self._set_healthy(False)
             logger.info("Redis disconnected")
 
-    async def get(self, key: str) -> str | None:
-        if not self._client:
+    def _set_healthy(self, healthy: bool) -> None:
+        self._healthy = healthy
+        REDIS_CONNECTED.set(1 if healthy else 0)
+
+    def _schedule_reconnect(self) -> None:
+        if self._client is None or (self._reconnect_task and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+        while not self._healthy:
+            await asyncio.sleep(delay)
+            try:
+                await self._client.ping()
+                self._set_healthy(True)
+                logger.info("Redis reconnected")
+            except Exception as e:
+                logger.debug(f"Redis reconnect failed: {e}")
+                delay = min(delay * 2, settings.REDIS_RECONNECT_MAX_DELAY)
+
+    def _on_error(self, operation: str, e: Exception) -> None:
+        REDIS_FALLBACKS.labels(operation).inc()
+        logger.error(f"Redis {operation} error: {e}")
+        if isinstance(e, (RedisConnectionError, RedisTimeoutError)):
+            self._set_healthy(False)
+            self._schedule_reconnect()
+
+    async def ping(self) -> bool:
+        if not self.is_connected:
+            return False
+        try:
+            await self._client.ping()
+            return True
+        except Exception as e:
+            self._on_error("ping", e)
+            return False
+
+    async def get(self, key: str, local: bool = True) -> str | None:
+        if local or not self.is_connected:
+            value = self._local.get(key)
+            if value is not None:
+                REDIS_CACHE_REQUESTS.labels("local", "hit").inc()
+                return value
+        if not self.is_connected:
+            REDIS_CACHE_REQUESTS.labels("local", "miss").inc()
+            REDIS_FALLBACKS.labels("get").inc()
+            return None
+        try:
+            value = await self._client.get(key)
+        except Exception as e:
+            self._on_error("get", e)
             return None
+        REDIS_CACHE_REQUESTS.labels("redis", "hit" if value is not None else "miss").inc()
+        if value is not None and local:
+            self._local.set(key, value)
+        return value
+
+    async def mget(self, keys: list[str], local: bool = True) -> list[str | None]:
+        """
+        Multi-key get: local hits are served in place and the rest are
+        fetched from Redis with a single MGET.
+        """
+        if local or not self.is_connected:
+            values = [self._local.get(key) for key in keys]
+        else:
+            values = [None] * len(keys)
+        missing = [index for index, value in enumerate(values) if value is None]
+        REDIS_CACHE_REQUESTS.labels("local", "hit").inc(len(keys) - len(missing))
+        if not missing:
+            return values
+        if not self.is_connected:
+            REDIS_CACHE_REQUESTS.labels("local", "miss").inc(len(missing))
+            REDIS_FALLBACKS.labels("mget").inc()
+            return values
+        try:
+            fetched = await self._client.mget([keys[index] for index in missing])
+        except Exception as e:
+            self._on_error("mget", e)
+            return values
+
+        hits = 0
+        for index, value in zip(missing, fetched):
+            if value is not None:
+                hits += 1
+                values[index] = value
+                if local:
+                    self._local.set(keys[index], value)
+        REDIS_CACHE_REQUESTS.labels("redis", "hit").inc(hits)
+        REDIS_CACHE_REQUESTS.labels("redis", "miss").inc(len(missing) - hits)
+        return values
+
+    async def ttl(self, key: str) -> int | None:
+        if not self.is_connected:
+            remaining = self._local.remaining_ttl(key)
+            return int(remaining) if remaining is not None else None
         try:
-            return await self._client.get(key)
+            return await self._client.ttl(key)
         except Exception as e:
-            logger.error(f"Redis get error: {e}")
+            self._on_error("ttl", e)
             return None
 
+    def _set_local(self, key: str, value: str, ttl: int | None, written_through: bool, local: bool = True) -> None:
+        if written_through:
+            if not local:
+                # Drop a copy left over from an outage so it cannot shadow Redis
+                self._local.delete(key)
+                return
+            ttl = min(ttl, self.local_ttl) if ttl else self.local_ttl
+        self._local.set(key, value, ttl=ttl)
+
     async def set(
         self, 
         key: str, 
         value: str, 
-        ttl: int | None = None
+        ttl: int | None = None,
+        local: bool = True,
     ) -> bool:
-        if not self._client:
+        if not self.is_connected:
+            REDIS_FALLBACKS.labels("set").inc()
+            self._set_local(key, value, ttl, written_through=False)
             return False
         try:
             await self._client.set(key, value, ex=ttl)
+        except Exception as e:
+            self._on_error("set", e)
+            self._set_local(key, value, ttl, written_through=False)
+            return False
+        self._set_local(key, value, ttl, written_through=True, local=local)
+        return True
+
+    async def mset(self, mapping: dict[str, str], ttl: int | None = None, local: bool = True) -> bool:
+        """
+        Multi-key set with a per-key TTL, sent as one non-transactional
+        pipeline round trip.
+        """
+        if not mapping:
             return True
+        if not self.is_connected:
+            REDIS_FALLBACKS.labels("mset").inc()
+            for key, value in mapping.items():
+                self._set_local(key, value, ttl, written_through=False)
+            return False
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.set(key, value, ex=ttl)
+                await pipe.execute()
         except Exception as e:
-            logger.error(f"Redis set error: {e}")
+            self._on_error("mset", e)
+            for key, value in mapping.items():
+                self._set_local(key, value, ttl, written_through=False)
             return False
+        for key, value in mapping.items():
+            self._set_local(key, value, ttl, written_through=True, local=local)
+        return True
 
     async def delete(self, key: str) -> bool:
-        if not self._client:
+        """
+        Removes the key from Redis and from this process's local tier only;
+        other replicas may serve their local copy for up to
+        REDIS_LOCAL_CACHE_TTL.
+        """
+        self._local.delete(key)
+        if not self.is_connected:
+            REDIS_FALLBACKS.labels("delete").inc()
             return False
         try:
             await self._client.delete(key)
             return True
         except Exception as e:
-            logger.error(f"Redis delete error: {e}")
+            self._on_error("delete", e)
+            return False
+
+    async def xadd(
+        self,
+        stream: str,
+        fields: dict[str, str],
+        maxlen: int | None = None,
+    ) -> str | None:
+        if not self.is_connected:
+            return None
+        try:
+            return await self._client.xadd(stream, fields, maxlen=maxlen, approximate=True)
+        except Exception as e:
+            self._on_error("xadd", e)
+            return None
+
+    async def xgroup_create(self, stream: str, group: str) -> bool:
+        if not self.is_connected:
+            return False
+        try:
+            await self._client.xgroup_create(stream, group, id="0", mkstream=True)
+            return True
+        except ResponseError as e:
+            if "BUSYGROUP" in str(e):
+                return True
+            self._on_error("xgroup_create", e)
+            return False
+        except Exception as e:
+            self._on_error("xgroup_create", e)
+            return False
+
+    async def xreadgroup(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        count: int = 1,
+        block: int | None = None,
+    ) -> list[tuple[str, dict[str, str]]]:
+        if not self.is_connected:
+            return []
+        try:
+            response = await self._client.xreadgroup(
+                group, consumer, {stream: ">"}, count=count, block=block
+            )
+        except Exception as e:
+            self._on_error("xreadgroup", e)
+            return []
+        if not response:
+            return []
+        return [entry for _, entries in response for entry in entries]
+
+    async def xautoclaim(
+        self,
+        stream: str,
+        group: str,
+        consumer: str,
+        min_idle_time: int,
+        count: int = 1,
+    ) -> list[tuple[str, dict[str, str]]]:
+        if not self.is_connected:
+            return []
+        try:
+            response = await self._client.xautoclaim(
+                stream, group, consumer, min_idle_time, count=count
+            )
+        except Exception as e:
+            self._on_error("xautoclaim", e)
+            return []
+        return [entry for entry in response[1] if entry and entry[1]]
+
+    async def xpending_deliveries(self, stream: str, group: str, message_id: str) -> int:
+        if not self.is_connected:
+            return 0
+        try:
+            pending = await self._client.xpending_range(
+                stream, group, min=message_id, max=message_id, count=1
+            )
+        except Exception as e:
+            self._on_error("xpending", e)
+            return 0
+        return pending[0]["times_delivered"] if pending else 0
+
+    async def xack(self, stream: str, group: str, message_id: str) -> bool:
+        if not self.is_connected:
+            return False
+        try:
+            await self._client.xack(stream, group, message_id)
+            return True
+        except Exception as e:
+            self._on_error("xack", e)
             return False
 
 
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from app.core.metrics import UPSTREAM_CIRCUIT_STATE, UPSTREAM_CONCURRENCY_LIMIT
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailableError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens when the failure rate or the slow-call rate over the last
+    `window_size` calls crosses its threshold, rejects calls for
+    `open_seconds`, then lets `half_open_calls` probes through. The probes
+    must all succeed quickly for the breaker to close again.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float,
+        slow_call_seconds: float,
+        slow_call_rate: float,
+        window_size: int,
+        min_calls: int,
+        open_seconds: float,
+        half_open_calls: int,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._set_state(self.CLOSED)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        UPSTREAM_CIRCUIT_STATE.labels(self.name).set(self.STATE_VALUES[state])
+
+    def _open(self) -> None:
+        if self.state != self.OPEN:
+            logger.warning(f"Circuit breaker for {self.name} opened")
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._set_state(self.OPEN)
+
+    def _close(self) -> None:
+        logger.info(f"Circuit breaker for {self.name} closed")
+        self._outcomes.clear()
+        self._set_state(self.CLOSED)
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                return False
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+            self._set_state(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_calls:
+                return False
+            self._probes_in_flight += 1
+
+        return True
+
+    def cancel(self) -> None:
+        """Gives back a call allowed by allow() that never reached the upstream."""
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    def record(self, success: bool, duration: float) -> None:
+        slow = duration >= self.slow_call_seconds
+
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            if not success or slow:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._close()
+            return
+
+        if self.state == self.OPEN:
+            return
+
+        self._outcomes.append((success, slow))
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+
+        failures = sum(1 for ok, _ in self._outcomes if not ok)
+        slow_calls = sum(1 for _, is_slow in self._outcomes if is_slow)
+        if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+            self._open()
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on in-flight requests: every fast success grows the limit by
+    1/limit (about +1 per limit's worth of calls), every failure or call
+    slower than `latency_target` shrinks it by `backoff_ratio`. Callers
+    above the limit wait up to `queue_timeout` for a slot.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        queue_timeout: float,
+        backoff_ratio: float = 0.7,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.queue_timeout = queue_timeout
+        self.backoff_ratio = backoff_ratio
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        UPSTREAM_CONCURRENCY_LIMIT.labels(name).set(int(self.limit))
+
+    async def acquire(self) -> bool:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._free_slot()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _free_slot(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def release(self, success: bool, duration: float) -> None:
+        if success and duration < self.latency_target:
+            self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+        else:
+            self.limit = max(self.limit * self.backoff_ratio, self.min_limit)
+
+        self._free_slot()
+        UPSTREAM_CONCURRENCY_LIMIT.labels(self.name).set(int(self.limit))
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket shared by concurrent callers: `rate` tokens per second with
+    room for `burst`. acquire() waits for a token; pause() holds every caller
+    back, e.g. after the upstream answered 429.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self._tokens + (now - self._updated_at) * self.rate, self.burst)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
@@ -0,0 +1,47 @@
+"""
+Direct JSON byte responses for hot endpoints.
+
+An endpoint that returns a Response skips FastAPI's response_model
+validation and jsonable_encoder pass, so the body is serialized exactly once:
+models through their compiled pydantic-core serializer, envelopes through
+orjson. Already-encoded JSON (e.g. a webhook body) is embedded as-is with
+raw_json() instead of being parsed and re-encoded.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi import Response, status
+from pydantic import BaseModel
+
+
+def raw_json(content: bytes) -> orjson.Fragment:
+    return orjson.Fragment(content)
+
+
+def model_response(model: BaseModel, status_code: int = status.HTTP_200_OK) -> Response:
+    return Response(
+        content=model.__pydantic_serializer__.to_json(model),
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+def api_response(
+    success: bool,
+    message: str | None = None,
+    status_code: int | None = status.HTTP_200_OK,
+    data: Any = None,
+    http_status_code: int = status.HTTP_200_OK,
+) -> Response:
+    """GenericApiResponse body, encoded in a single orjson pass."""
+    return Response(
+        content=orjson.dumps({
+            "success": success,
+            "status_code": status_code,
+            "message": message,
+            "data": data,
+        }),
+        status_code=http_status_code,
+        media_type="application/json",
+    )
@@ -3,6 +3,10 @@ import hashlib
 import hmac
 import logging
 
+from fastapi import Header, HTTPException, status
+
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -10,23 +14,19 @@ class SignatureService:
     def __init__(self, public_key: str, secret_key: str):
         self.public_key = public_key
         self.secret_key = secret_key
+        self._public_key_bytes = public_key.encode("utf-8")
+        self._hmac = hmac.new(secret_key.encode("utf-8"), digestmod=hashlib.sha512)
 
-    def generate_signature(self, payload: str, method: str = "POST") -> str:
+    def generate_signature(self, payload: str | bytes, method: str = "POST") -> str:
+        hmac_hash = self._hmac.copy()
+        hmac_hash.update(self._public_key_bytes)
+        if method not in ["GET", "DELETE"]:
+            hmac_hash.update(payload.encode("utf-8") if isinstance(payload, str) else payload)
+        hmac_hash.update(self._public_key_bytes)
 
-        if method in ["GET", "DELETE"]:
-            data = self.public_key + self.public_key
-        else:
-            data = self.public_key + payload + self.public_key
-        
-        hmac_hash = hmac.new(
-            self.secret_key.encode("utf-8"),
-            data.encode("utf-8"),
-            hashlib.sha512
-        ).digest()
-        
-        return base64.b64encode(hmac_hash.hex().encode("utf-8")).decode("utf-8")
-
-    def verify_signature(self, payload: str, received_signature: str, method: str = "POST") -> bool:
+        return base64.b64encode(hmac_hash.hexdigest().encode("utf-8")).decode("utf-8")
+
+    def verify_signature(self, payload: str | bytes, received_signature: str, method: str = "POST") -> bool:
         expected = self.generate_signature(payload, method)
         is_valid = hmac.compare_digest(expected, received_signature)
 
@@ -35,4 +35,17 @@ class SignatureService:
         else:
             logger.debug("Signature verified successfully")
 
-        return is_valid
\ No newline at end of file
+        return is_valid
+
+
+def require_admin_key(x_admin_key: str = Header(default="")) -> None:
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled"
+        )
+    if not hmac.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin key"
+        )
@@ -0,0 +1,97 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.payment import PaymentInitialization
+from app.models.webhook import WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_ORDER_STATUSES = ("settle_ok", "auth_failed", "declined", "void_ok", "refunded")
+
+
+async def record_payment_initializations(
+    db: AsyncSession,
+    initializations: list[dict],
+) -> None:
+    """
+    Remembers orders handed to the PSP so the status poller can find the
+    ones whose webhooks never arrive. Re-initializing an order keeps the
+    original row.
+    """
+    if not initializations:
+        return
+    await db.execute(
+        insert(PaymentInitialization)
+        .values(initializations)
+        .on_conflict_do_nothing(index_elements=[PaymentInitialization.order_id])
+    )
+    await db.commit()
+
+async def claim_unresolved_payment_initializations(
+    db: AsyncSession,
+    created_from: datetime,
+    created_before: datetime,
+    checked_before: datetime,
+    limit: int,
+) -> list[str]:
+    """
+    Stamps last_checked_at on up to `limit` unresolved orders initialized
+    between created_from and created_before that were not checked since
+    checked_before and have no terminal webhook event yet, and returns their
+    ids, oldest first. SKIP LOCKED keeps concurrent pollers on disjoint rows.
+    """
+    terminal_event = (
+        select(WebhookEvent.id)
+        .where(
+            WebhookEvent.medusa_order_id == PaymentInitialization.order_id,
+            WebhookEvent.created_at >= created_from,
+            WebhookEvent.payload["order"]["status"].astext.in_(TERMINAL_ORDER_STATUSES),
+        )
+        .exists()
+    )
+    candidates = (
+        select(PaymentInitialization.order_id)
+        .where(
+            PaymentInitialization.resolved_at.is_(None),
+            PaymentInitialization.created_at >= created_from,
+            PaymentInitialization.created_at < created_before,
+            (PaymentInitialization.last_checked_at.is_(None))
+            | (PaymentInitialization.last_checked_at < checked_before),
+            ~terminal_event,
+        )
+        .order_by(PaymentInitialization.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(PaymentInitialization)
+        .where(PaymentInitialization.order_id.in_(candidates.scalar_subquery()))
+        .values(last_checked_at=func.now())
+        .returning(PaymentInitialization.order_id, PaymentInitialization.created_at)
+        .execution_options(synchronize_session=False)
+    )
+    rows = sorted(result.all(), key=lambda row: row.created_at)
+    await db.commit()
+    return [row.order_id for row in rows]
+
+async def mark_payment_initializations_resolved(
+    db: AsyncSession,
+    order_ids: list[str],
+) -> int:
+    if not order_ids:
+        return 0
+    result = await db.execute(
+        update(PaymentInitialization)
+        .where(
+            PaymentInitialization.order_id.in_(order_ids),
+            PaymentInitialization.resolved_at.is_(None),
+        )
+        .values(resolved_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
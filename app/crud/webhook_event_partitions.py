@@ -0,0 +1,91 @@
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import AsyncIterator
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.models.webhook import WebhookEventKey
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "webhook_events"
+PARTITION_NAME = re.compile(r"^webhook_events_y(\d{4})m(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    month = value.month - 1 + months
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def _utc_bound(month: date) -> str:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc).isoformat()
+
+
+async def list_monthly_partitions(db: AsyncSession) -> dict[date, str]:
+    result = await db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = CAST(:parent AS regclass)"
+    ), {"parent": PARENT_TABLE})
+
+    partitions = {}
+    for (name,) in result:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+async def create_monthly_partition(db: AsyncSession, month: date) -> str:
+    name = partition_name(month)
+    await db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{_utc_bound(month)}') TO ('{_utc_bound(add_months(month, 1))}')"
+    ))
+    await db.commit()
+    return name
+
+
+async def stream_partition_rows(db: AsyncSession, name: str, chunk_size: int = 1000) -> AsyncIterator[list[str]]:
+    """
+    Yields the partition's rows as JSON text in chunks, rendered by Postgres
+    and read through a server-side cursor so the whole partition never sits
+    in memory.
+    """
+    result = await db.stream(text(f"SELECT row_to_json(archived)::text FROM {name} AS archived"))
+    async for rows in result.partitions(chunk_size):
+        yield [row[0] for row in rows]
+
+
+async def drop_partition(db: AsyncSession, name: str) -> None:
+    await db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    await db.execute(text(f"DROP TABLE {name}"))
+    await db.commit()
+
+
+async def delete_event_keys_before(db: AsyncSession, before: datetime) -> int:
+    result = await db.execute(
+        delete(WebhookEventKey).where(WebhookEventKey.created_at < before)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def try_advisory_xact_lock(conn: AsyncConnection, key: int) -> bool:
+    """
+    Transaction-scoped, so Postgres releases it on commit or rollback of the
+    caller's transaction. Unlike a session lock it cannot outlive the work
+    on a pooled server connection (PgBouncer transaction pooling) or be
+    orphaned when the connection is discarded (NullPool).
+    """
+    return bool(await conn.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": key}))
@@ -1,25 +1,72 @@
 import logging
+from datetime import datetime
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Float, case, cast, column, func, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
-from app.models.webhook import WebhookEvent
-from app.schemas.webhook import WebhookEventCreate, WebhookEventResponse
+from app.models.webhook import WebhookEvent, WebhookEventKey, generate_webhook_id
+from app.schemas.webhook import WebhookEventCreate, WebhookEventDetail, WebhookEventResponse
 
 logger = logging.getLogger(__name__)
 
 
+def _claim_and_insert(webhook_events: list[WebhookEventCreate]):
+    """
+    Builds one statement that claims each event_id in webhook_event_keys
+    (ON CONFLICT DO NOTHING) and inserts into webhook_events only the rows
+    whose key was claimed, stamping them with the key's created_at.
+    """
+    rows: dict[str, dict] = {}
+    for webhook_event in webhook_events:
+        rows.setdefault(webhook_event.event_id, {"id": generate_webhook_id(), **webhook_event.model_dump()})
+    names = list(next(iter(rows.values())))
+
+    claimed = (
+        insert(WebhookEventKey)
+        .values([{"event_id": event_id} for event_id in rows])
+        .on_conflict_do_nothing(index_elements=[WebhookEventKey.event_id])
+        .returning(WebhookEventKey.event_id, WebhookEventKey.created_at)
+        .cte("claimed")
+    )
+    types = {name: WebhookEvent.__table__.c[name].type for name in names}
+    incoming = values(
+        *[column(name, types[name]) for name in names],
+        name="incoming",
+    ).data([tuple(row[name] for name in names) for row in rows.values()])
+
+    return (
+        insert(WebhookEvent)
+        .from_select(
+            [*names, "created_at"],
+            # NULL-only VALUES columns resolve to text, hence the casts
+            select(*[cast(incoming.c[name], types[name]) for name in names], claimed.c.created_at)
+            .select_from(incoming.join(claimed, incoming.c.event_id == claimed.c.event_id)),
+            include_defaults=False,
+        )
+        .add_cte(claimed)
+        .returning(WebhookEvent)
+    )
+
 async def create_webhook_event(
     db: AsyncSession, 
     webhook_event: WebhookEventCreate
-) -> WebhookEventResponse:
+) -> WebhookEventResponse | None:
+    """
+    Claims the event and returns the stored row in a single statement (see
+    _claim_and_insert), committed straight away in the session's own
+    transaction. Returns None when the event_id was already recorded.
+    """
     try:
-        db_webhook_event = WebhookEvent(**webhook_event.model_dump())
-        db.add(db_webhook_event)
+        result = await db.execute(_claim_and_insert([webhook_event]))
+        db_webhook_event = result.scalar_one_or_none()
         await db.commit()
-        await db.refresh(db_webhook_event)
-        
+
+        if db_webhook_event is None:
+            return None
+
         logger.info("webhook_event created successfully")
         
         return WebhookEventResponse.model_validate(db_webhook_event)
@@ -32,11 +79,304 @@ async def create_webhook_event(
             detail="An unexpected error occurred"
         )
 
+async def create_webhook_events_bulk(
+    db: AsyncSession,
+    webhook_events: list[WebhookEventCreate],
+) -> dict[str, WebhookEventResponse]:
+    """
+    Multi-row variant of create_webhook_event. Returns the inserted rows keyed
+    by event_id; event_ids missing from the result were already recorded.
+    """
+    result = await db.execute(_claim_and_insert(webhook_events))
+    inserted = {
+        db_webhook_event.event_id: WebhookEventResponse.model_validate(db_webhook_event)
+        for db_webhook_event in result.scalars()
+    }
+    await db.commit()
+    return inserted
+
+def _event_filter(event_id: str):
+    """
+    Matches one event by event_id and pins created_at to the value stored in
+    webhook_event_keys, so Postgres prunes the lookup to a single partition
+    instead of probing the event_id index of every partition.
+    """
+    return (
+        WebhookEvent.event_id == event_id,
+        WebhookEvent.created_at == (
+            select(WebhookEventKey.created_at)
+            .where(WebhookEventKey.event_id == event_id)
+            .scalar_subquery()
+        ),
+    )
+
 async def get_webhook_event_by_event_id(
     db: AsyncSession, 
     event_id: str
 ):
     result = await db.execute(
-        select(WebhookEvent).where(WebhookEvent.event_id == event_id)
+        select(WebhookEvent).where(*_event_filter(event_id))
+    )
+    return result.scalar_one_or_none()
+
+async def update_webhook_event_status(
+    db: AsyncSession,
+    event_id: str,
+    processed: bool,
+    error_message: str | None = None,
+) -> None:
+    await db.execute(
+        update(WebhookEvent)
+        .where(*_event_filter(event_id))
+        .values(processed=processed, error_message=error_message)
+    )
+    await db.commit()
+
+async def mark_webhook_event_processed(
+    db: AsyncSession,
+    event_id: str,
+) -> None:
+    await db.execute(
+        update(WebhookEvent)
+        .where(*_event_filter(event_id))
+        .values(processed=True, next_attempt_at=None)
+    )
+    await db.commit()
+
+async def record_webhook_event_failure(
+    db: AsyncSession,
+    event_id: str,
+    error_message: str,
+    max_attempts: int,
+    base_delay: float,
+    max_delay: float,
+) -> WebhookEventResponse | None:
+    """
+    Counts a failed processing attempt and either schedules the next one with
+    exponential backoff and jitter (between half and the full
+    base_delay * 2^attempts, capped at max_delay) or, once max_attempts is
+    reached, moves the event to the dead-letter state. Events another path
+    already processed are left alone (returns None).
+    """
+    attempts = WebhookEvent.attempts + 1
+    exhausted = attempts >= max_attempts
+    delay = func.least(
+        cast(base_delay, Float) * func.power(cast(2, Float), WebhookEvent.attempts),
+        cast(max_delay, Float),
+    ) * (cast(0.5, Float) + func.random() * cast(0.5, Float))
+    result = await db.execute(
+        update(WebhookEvent)
+        .where(*_event_filter(event_id), WebhookEvent.processed.is_(False))
+        .values(
+            attempts=attempts,
+            error_message=error_message,
+            next_attempt_at=case(
+                (exhausted, None),
+                else_=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, delay),
+            ),
+            dead_lettered_at=case((exhausted, func.now()), else_=None),
+        )
+        .returning(WebhookEvent)
+    )
+    db_webhook_event = result.scalar_one_or_none()
+    await db.commit()
+    if db_webhook_event is None:
+        return None
+    return WebhookEventResponse.model_validate(db_webhook_event)
+
+async def dead_letter_webhook_event(
+    db: AsyncSession,
+    event_id: str,
+    error_message: str,
+) -> None:
+    await db.execute(
+        update(WebhookEvent)
+        .where(*_event_filter(event_id), WebhookEvent.processed.is_(False))
+        .values(
+            error_message=error_message,
+            next_attempt_at=None,
+            dead_lettered_at=func.now(),
+        )
+    )
+    await db.commit()
+
+async def claim_due_webhook_events(
+    db: AsyncSession,
+    limit: int,
+    lease_seconds: int,
+) -> list[WebhookEventDetail]:
+    """
+    Leases up to `limit` events whose retry is due by pushing their
+    next_attempt_at `lease_seconds` into the future, in one statement.
+    SKIP LOCKED lets several replicas drain the table without handing out
+    the same event twice; if the claiming process dies the lease simply
+    expires and the event becomes due again.
+    """
+    due = (
+        select(WebhookEvent.id)
+        .where(
+            WebhookEvent.processed.is_(False),
+            WebhookEvent.dead_lettered_at.is_(None),
+            WebhookEvent.next_attempt_at <= func.now(),
+        )
+        .order_by(WebhookEvent.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(WebhookEvent)
+        .where(WebhookEvent.id.in_(due))
+        .values(next_attempt_at=func.now() + func.make_interval(0, 0, 0, 0, 0, 0, cast(lease_seconds, Float)))
+        .returning(WebhookEvent)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = [WebhookEventDetail.model_validate(row) for row in result.scalars()]
+    await db.commit()
+    return claimed
+
+async def list_dead_letter_webhook_events(
+    db: AsyncSession,
+    limit: int = 50,
+    offset: int = 0,
+) -> tuple[list[WebhookEventDetail], int]:
+    dead_lettered = WebhookEvent.dead_lettered_at.is_not(None)
+    count = await db.scalar(select(func.count()).select_from(WebhookEvent).where(dead_lettered))
+    result = await db.execute(
+        select(WebhookEvent)
+        .where(dead_lettered)
+        .order_by(WebhookEvent.dead_lettered_at.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    return [WebhookEventDetail.model_validate(row) for row in result.scalars()], count or 0
+
+async def redrive_webhook_events(
+    db: AsyncSession,
+    event_ids: list[str] | None = None,
+    limit: int = 100,
+) -> list[WebhookEventDetail]:
+    """
+    Moves dead-lettered events back to the retry schedule with a fresh
+    attempt budget, due immediately. Without event_ids, re-drives the
+    `limit` most recently dead-lettered events.
+    """
+    selected = (
+        select(WebhookEvent.id)
+        .where(WebhookEvent.dead_lettered_at.is_not(None))
+        .order_by(WebhookEvent.dead_lettered_at.desc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if event_ids:
+        selected = selected.where(WebhookEvent.event_id.in_(event_ids))
+    result = await db.execute(
+        update(WebhookEvent)
+        .where(WebhookEvent.id.in_(selected.scalar_subquery()))
+        .values(attempts=0, next_attempt_at=func.now(), dead_lettered_at=None)
+        .returning(WebhookEvent)
+        .execution_options(synchronize_session=False)
+    )
+    redriven = [WebhookEventDetail.model_validate(row) for row in result.scalars()]
+    await db.commit()
+    return redriven
+
+async def list_webhook_events(
+    db: AsyncSession,
+    limit: int,
+    psp: str | None = None,
+    event_type: str | None = None,
+    medusa_order_id: str | None = None,
+    processed: bool | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    after: tuple[datetime, str] | None = None,
+    include_payload: bool = False,
+) -> list[WebhookEventDetail | WebhookEventResponse]:
+    """
+    Newest-first keyset page: rows strictly before `after` (the last
+    (created_at, id) of the previous page) in (created_at, id) order.
+    Every filter combination is served by one index range scan:
+    medusa_order_id -> ix_webhook_events_order_timeline,
+    processed=false -> ix_webhook_events_unprocessed,
+    psp + event_type -> ix_webhook_events_psp_event_type_created_at,
+    anything else -> ix_webhook_events_created_at_id. The created_at range
+    also prunes partitions.
+    """
+    query = select(WebhookEvent)
+    if not include_payload:
+        query = query.options(defer(WebhookEvent.payload))
+    if psp is not None:
+        query = query.where(WebhookEvent.psp == psp)
+    if event_type is not None:
+        query = query.where(WebhookEvent.event_type == event_type)
+    if medusa_order_id is not None:
+        query = query.where(WebhookEvent.medusa_order_id == medusa_order_id)
+    if processed is not None:
+        query = query.where(WebhookEvent.processed.is_(processed))
+    if created_from is not None:
+        query = query.where(WebhookEvent.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(WebhookEvent.created_at < created_to)
+    if after is not None:
+        query = query.where(tuple_(WebhookEvent.created_at, WebhookEvent.id) < tuple_(*after))
+
+    result = await db.execute(
+        query
+        .order_by(WebhookEvent.created_at.desc(), WebhookEvent.id.desc())
+        .limit(limit)
+    )
+    schema = WebhookEventDetail if include_payload else WebhookEventResponse
+    return [schema.model_validate(row) for row in result.scalars()]
+
+def _is_settle_ok():
+    return WebhookEvent.payload["order"]["status"].astext == "settle_ok"
+
+async def list_uncaptured_settled_orders(
+    db: AsyncSession,
+    created_from: datetime,
+    settled_before: datetime,
+    limit: int,
+) -> list[str]:
+    """
+    Orders with at least one settle_ok event since created_from and none of
+    them processed, whose latest settle_ok arrived before settled_before (so
+    in-flight webhook handling is left alone). Orders with an event the retry
+    scheduler holds a lease on or has scheduled (next_attempt_at in the
+    future) are left to it. Oldest first.
+    """
+    result = await db.execute(
+        select(WebhookEvent.medusa_order_id)
+        .where(
+            _is_settle_ok(),
+            WebhookEvent.medusa_order_id.is_not(None),
+            WebhookEvent.medusa_order_id != "",
+            WebhookEvent.created_at >= created_from,
+        )
+        .group_by(WebhookEvent.medusa_order_id)
+        .having(func.bool_or(WebhookEvent.processed).is_(False))
+        .having(func.max(WebhookEvent.created_at) < settled_before)
+        .having(func.bool_or(func.coalesce(WebhookEvent.next_attempt_at > func.now(), False)).is_(False))
+        .order_by(func.min(WebhookEvent.created_at))
+        .limit(limit)
+    )
+    return list(result.scalars())
+
+async def mark_order_settle_events_processed(
+    db: AsyncSession,
+    order_ids: list[str],
+    created_from: datetime,
+) -> int:
+    result = await db.execute(
+        update(WebhookEvent)
+        .where(
+            _is_settle_ok(),
+            WebhookEvent.medusa_order_id.in_(order_ids),
+            WebhookEvent.processed.is_(False),
+            WebhookEvent.created_at >= created_from,
+        )
+        .values(processed=True, next_attempt_at=None, dead_lettered_at=None)
+        .execution_options(synchronize_session=False)
     )
-    return result.scalar_one_or_none()
\ No newline at end of file
+    await db.commit()
+    return result.rowcount
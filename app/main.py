@@ -1,30 +1,70 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from uuid import uuid4
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import db_pool_stats, dispose_engine, get_engine, warm_up_pool
+from app.core.http import http_clients
+from app.core.metrics import IN_FLIGHT_REQUESTS, render_metrics
+from app.core.logging_config import request_id_var, setup_logging, shutdown_logging
 from app.api.v1.api import api_router
 from app.core.redis import redis_client
+from app.core.security import require_admin_key
+from app.services.capture_reconciliation_service import capture_reconciliation_service
+from app.services.solidgate_service import solidgate_service
+from app.services.solidgate_status_poller import solidgate_status_poller
+from app.services.medusa_service import medusa_service
+from app.services.order_lanes import order_lanes
+from app.services.readiness_service import readiness_service
+from app.services.webhook_event_writer import webhook_event_writer
+from app.services.webhook_queue_service import webhook_queue_service
+from app.services.webhook_retention_service import webhook_retention_service
+from app.services.webhook_retry_service import webhook_retry_service
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    setup_logging()
     logger.info("Starting up...")
-    await redis_client.connect()
+    if not settings.SOLIDGATE_WEBHOOK_VERIFY_SIGNATURE:
+        logger.warning("Solidgate webhook signature verification is disabled; webhooks are accepted unauthenticated")
+    get_engine()
+    # Independent network handshakes; overlapping them shortens cold start
+    await asyncio.gather(redis_client.connect(), http_clients.connect(), warm_up_pool())
+    medusa_service.start_token_refresh()
+    order_lanes.start()
+    if settings.WEBHOOK_EVENT_BATCHING:
+        webhook_event_writer.start()
+    if settings.webhook_queue_enabled:
+        await webhook_queue_service.start()
+    if settings.WEBHOOK_RETRY_ENABLED:
+        webhook_retry_service.start()
+    webhook_retention_service.start()
+    capture_reconciliation_service.start()
+    solidgate_status_poller.start()
+    readiness_service.start()
     yield
     logger.info("Shutting down...")
+    await readiness_service.stop()
+    await solidgate_status_poller.stop()
+    await capture_reconciliation_service.stop()
+    await webhook_retention_service.stop()
+    await webhook_retry_service.stop()
+    await webhook_queue_service.stop()
+    await webhook_event_writer.stop()
+    await order_lanes.stop()
+    await medusa_service.stop_token_refresh()
+    await solidgate_service.shutdown()
+    await http_clients.disconnect()
     await redis_client.disconnect()
-    await engine.dispose()
+    await dispose_engine()
+    shutdown_logging()
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -40,6 +80,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def bind_request_id(request: Request, call_next):
+    token = request_id_var.set(request.headers.get("x-request-id") or uuid4().hex)
+    IN_FLIGHT_REQUESTS.inc()
+    try:
+        return await call_next(request)
+    finally:
+        IN_FLIGHT_REQUESTS.dec()
+        request_id_var.reset(token)
+
 app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/")
@@ -48,4 +98,18 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness_check():
+    status_code, content = readiness_service.current()
+    return Response(content=content, status_code=status_code, media_type="application/json")
+
+@app.get("/health/pools", dependencies=[Depends(require_admin_key)])
+def pool_stats():
+    return {"db": db_pool_stats(), "http": http_clients.stats()}
+
+@app.get("/metrics")
+def metrics():
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Payment initialization model for tracking orders sent to the PSP.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class PaymentInitialization(Base):
+    __tablename__ = "payment_initializations"
+    __table_args__ = (
+        Index(
+            "ix_payment_initializations_unresolved",
+            "created_at",
+            postgresql_where=text("resolved_at IS NULL"),
+        ),
+    )
+
+    order_id: Mapped[str] = mapped_column(
+        String(255),
+        primary_key=True,
+    )
+    psp: Mapped[str] = mapped_column(
+        String(50),
+    )
+    amount: Mapped[int] = mapped_column(
+        Integer,
+    )
+    currency: Mapped[str] = mapped_column(
+        String(3),
+    )
+    last_checked_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    resolved_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return f"<PaymentInitialization {self.order_id} {self.psp}>"
@@ -5,7 +5,7 @@ Webhook event model for storing PSP webhook data.
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, String, Text, func
+from sqlalchemy import Boolean, DateTime, Index, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -16,8 +16,50 @@ def generate_webhook_id() -> str:
     return f"wh_evt_{uuid.uuid4().hex}"
 
 
+class WebhookEventKey(Base):
+    """
+    One narrow row per received event_id. webhook_events is range-partitioned
+    by created_at, and Postgres cannot enforce a unique event_id across
+    partitions, so idempotency is claimed here instead. created_at matches
+    the stored event's created_at, which lets event_id lookups prune
+    webhook_events down to a single partition.
+    """
+    __tablename__ = "webhook_event_keys"
+
+    event_id: Mapped[str] = mapped_column(
+        String(255),
+        primary_key=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+
+
 class WebhookEvent(Base):
     __tablename__ = "webhook_events"
+    __table_args__ = (
+        Index("ix_webhook_events_created_at_id", "created_at", "id"),
+        Index("ix_webhook_events_order_timeline", "medusa_order_id", "created_at", "id"),
+        Index("ix_webhook_events_psp_event_type_created_at", "psp", "event_type", "created_at", "id"),
+        Index(
+            "ix_webhook_events_unprocessed",
+            "created_at",
+            "id",
+            postgresql_where=text("processed = false"),
+        ),
+        Index(
+            "ix_webhook_events_retry_due",
+            "next_attempt_at",
+            postgresql_where=text("processed = false AND dead_lettered_at IS NULL"),
+        ),
+        Index(
+            "ix_webhook_events_dead_lettered_at",
+            "dead_lettered_at",
+            postgresql_where=text("dead_lettered_at IS NOT NULL"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
     id: Mapped[str] = mapped_column(
         String(50),
@@ -26,12 +68,10 @@ class WebhookEvent(Base):
     )
     event_id: Mapped[str] = mapped_column(
         String(255),
-        unique=True,
         index=True,
     )
     psp: Mapped[str] = mapped_column(
         String(50),
-        index=True,
     )
     event_type: Mapped[str] = mapped_column(
         String(100),
@@ -39,7 +79,6 @@ class WebhookEvent(Base):
     medusa_order_id: Mapped[str | None] = mapped_column(
         String(255),
         nullable=True,
-        index=True,
     )
     payload: Mapped[dict] = mapped_column(
         JSONB,
@@ -52,8 +91,22 @@ class WebhookEvent(Base):
         Text,
         nullable=True,
     )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+    )
+    next_attempt_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    dead_lettered_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         server_default=func.now(),
     )
     updated_at: Mapped[datetime | None] = mapped_column(
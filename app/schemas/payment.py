@@ -1,5 +1,9 @@
+from typing import Any
+
 from pydantic import BaseModel, ConfigDict
 
+from app.schemas.common import SuccessResponse
+
 class PaymentInitializeBase(BaseModel):
     order_id: str | None = None
     amount: int | None = None
@@ -24,4 +28,37 @@ class PaymentInitializeResponse(BaseModel):
     psp: str
     merchant: str
     signature: str
-    payment_intent: str
\ No newline at end of file
+    payment_intent: str
+
+class PaymentInitializeBatchBase(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    def to_json(self):
+        return self.model_dump_json()
+
+
+class PaymentInitializeBatchRequest(PaymentInitializeBatchBase):
+    items: list[dict[str, Any]]
+
+
+class PaymentInitializeBatchItemResponse(PaymentInitializeBatchBase):
+    index: int
+    order_id: str | None = None
+    success: bool
+    message: str | None = None
+    data: PaymentInitializeResponse | None = None
+
+
+class PaymentInitializeBatchResponse(PaymentInitializeBatchBase):
+    total: int
+    succeeded: int
+    failed: int
+    results: list[PaymentInitializeBatchItemResponse]
+
+
+class PaymentInitializeEnvelope(SuccessResponse):
+    data: PaymentInitializeResponse | None = None
+
+
+class PaymentInitializeBatchEnvelope(SuccessResponse):
+    data: PaymentInitializeBatchResponse | None = None
@@ -1,24 +1,47 @@
-
 from pydantic import BaseModel, ConfigDict
 
-class SolidgateWebhookBase(BaseModel):
-    event: str | None = None
-    order_id: str | None = None
-    transaction_id: str | None = None
-    amount: int | None = None
-    currency: str | None = None
+
+class SolidgateCardToken(BaseModel):
+    token: str | None = None
+
+
+class SolidgateTransaction(BaseModel):
+    id: str | None = None
+    operation: str | None = None
     status: str | None = None
-    payment_token: str | None = None
-    
-    model_config = ConfigDict(extra="allow")
-    
-    def to_json(self):
-        return self.model_dump_json()
-
-class SolidgateWebhookPayload(SolidgateWebhookBase):
-    event: str
+    card_token: SolidgateCardToken | None = None
+
+
+class SolidgateOrder(BaseModel):
     order_id: str
-    transaction_id: str
-    amount: int
-    currency: str
     status: str
+
+
+class SolidgateWebhookPayload(BaseModel):
+    """
+    The parts of a Solidgate order callback that routing needs. Unknown
+    fields are skipped while parsing, so they never become Python objects;
+    the raw body is stored as-is. The validator is compiled once when the
+    class is created and parses straight from bytes:
+
+        SolidgateWebhookPayload.model_validate_json(raw_body)
+    """
+
+    order: SolidgateOrder
+    transaction: SolidgateTransaction | None = None
+
+    model_config = ConfigDict(extra="ignore")
+
+    @property
+    def order_id(self) -> str:
+        return self.order.order_id
+
+    @property
+    def order_status(self) -> str:
+        return self.order.status
+
+    @property
+    def payment_token(self) -> str | None:
+        if self.transaction and self.transaction.card_token:
+            return self.transaction.card_token.token
+        return None
@@ -1,4 +1,7 @@
-from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+
+import orjson
+from pydantic import BaseModel, ConfigDict, field_serializer
 
 from app.schemas.base import BaseDBSchema
 
@@ -19,10 +22,35 @@ class WebhookEventCreate(WebhookEventBase):
     event_id: str
     psp: str
     event_type: str
-    payload: dict
+    # A Fragment holds the request body bytes, stored without a parse/encode round trip
+    payload: dict | orjson.Fragment
+    next_attempt_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True, arbitrary_types_allowed=True)
+
+    @field_serializer("payload", when_used="json")
+    def serialize_payload(self, payload: dict | orjson.Fragment) -> dict:
+        return orjson.loads(orjson.dumps(payload)) if isinstance(payload, orjson.Fragment) else payload
 
 class WebhookEventResponse(WebhookEventBase, BaseDBSchema):
-    pass
+    attempts: int = 0
+    next_attempt_at: datetime | None = None
+    dead_lettered_at: datetime | None = None
+
+class WebhookEventDetail(WebhookEventResponse):
+    payload: dict
+
+class WebhookEventListResponse(BaseModel):
+    items: list[WebhookEventDetail]
+    count: int
+
+class WebhookEventPage(BaseModel):
+    items: list[WebhookEventDetail | WebhookEventResponse]
+    next_cursor: str | None = None
+
+class WebhookEventRedriveRequest(BaseModel):
+    event_ids: list[str] | None = None
+    limit: int = 100
 
 class WebhookAck(BaseModel):
     success: bool = True
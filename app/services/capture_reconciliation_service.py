@@ -0,0 +1,167 @@
+"""
+Finds orders whose settle_ok webhook was stored but never led to a capture
+and captures them in bulk.
+
+Runs periodically from the app when CAPTURE_RECONCILE_INTERVAL > 0, or on
+demand:
+
+    python -m app.services.capture_reconciliation_service --dry-run
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud import webhook_events as webhook_events_crud
+from app.services.medusa_service import medusa_service
+from app.services.order_lanes import order_lanes
+
+logger = logging.getLogger(__name__)
+
+
+class CaptureReconciliationService:
+    def __init__(self):
+        self.interval = settings.CAPTURE_RECONCILE_INTERVAL
+        self.lookback = timedelta(days=settings.CAPTURE_RECONCILE_LOOKBACK_DAYS)
+        self.min_age = timedelta(seconds=settings.CAPTURE_RECONCILE_MIN_AGE)
+        self.max_orders = settings.CAPTURE_RECONCILE_MAX_ORDERS
+        self.batch_size = settings.CAPTURE_RECONCILE_BATCH_SIZE
+        self.concurrency = settings.CAPTURE_RECONCILE_CONCURRENCY
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is not None or self.interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Capture reconciliation started")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("Capture reconciliation stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Capture reconciliation failed: {e}")
+
+    async def reconcile(self, dry_run: bool = False, max_orders: int | None = None) -> dict[str, Any]:
+        """
+        Captures the payments of settled but uncaptured orders: one
+        webhook_events query for the candidates, one Medusa list request per
+        batch_size orders for their payments, then captures with at most
+        `concurrency` in flight, each on the order's processing lane. With
+        dry_run nothing is captured or written. Returns a throughput report.
+        """
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        created_from = now - self.lookback
+
+        async with AsyncSessionLocal() as db:
+            order_ids = await webhook_events_crud.list_uncaptured_settled_orders(
+                db,
+                created_from=created_from,
+                settled_before=now - self.min_age,
+                limit=max_orders or self.max_orders,
+            )
+
+        fetch_started = time.perf_counter()
+        payments = await medusa_service.get_payments_by_orders(order_ids, self.batch_size) if order_ids else {}
+        fetch_seconds = time.perf_counter() - fetch_started
+
+        already_captured = [order_id for order_id, payment in payments.items() if payment.get("captured_at")]
+        to_capture = [order_id for order_id, payment in payments.items() if not payment.get("captured_at")]
+        captured: list[str] = []
+        failed: list[str] = []
+
+        capture_started = time.perf_counter()
+        if not dry_run and to_capture:
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def capture(order_id: str) -> None:
+                async with semaphore:
+                    payment = await order_lanes.run(
+                        order_id, medusa_service.capture_payment, payments[order_id]["payment_id"]
+                    )
+                (captured if payment else failed).append(order_id)
+
+            await asyncio.gather(*(capture(order_id) for order_id in to_capture))
+        capture_seconds = time.perf_counter() - capture_started
+
+        settled = captured + already_captured
+        if not dry_run and settled:
+            for order_id in settled:
+                await medusa_service.invalidate_payment(order_id)
+            async with AsyncSessionLocal() as db:
+                await webhook_events_crud.mark_order_settle_events_processed(db, settled, created_from)
+
+        elapsed = time.perf_counter() - started
+        report = {
+            "dry_run": dry_run,
+            "candidates": len(order_ids),
+            "payments_found": len(payments),
+            "missing_payment": len(order_ids) - len(payments),
+            "already_captured": len(already_captured),
+            "to_capture": len(to_capture),
+            "captured": len(captured),
+            "failed": len(failed),
+            "failed_order_ids": failed,
+            "elapsed_s": round(elapsed, 3),
+            "fetch_s": round(fetch_seconds, 3),
+            "capture_s": round(capture_seconds, 3),
+            "orders_per_second": round(len(order_ids) / elapsed, 2) if elapsed else 0.0,
+        }
+        if dry_run:
+            report["would_capture_order_ids"] = to_capture
+
+        logger.info(
+            f"Capture reconciliation{' (dry run)' if dry_run else ''}: "
+            f"{len(order_ids)} candidates, {len(captured)} captured, {len(failed)} failed, "
+            f"{len(already_captured)} already captured in {elapsed:.2f}s"
+        )
+        return report
+
+
+capture_reconciliation_service = CaptureReconciliationService()
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    from app.core.database import dispose_engine
+    from app.core.http import http_clients
+    from app.core.redis import redis_client
+
+    await redis_client.connect()
+    await http_clients.connect()
+    try:
+        return await capture_reconciliation_service.reconcile(dry_run=args.dry_run, max_orders=args.max_orders)
+    finally:
+        await http_clients.disconnect()
+        await redis_client.disconnect()
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    from app.core.logging_config import setup_logging, shutdown_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report what would be captured without capturing")
+    parser.add_argument("--max-orders", type=int, default=None)
+    setup_logging()
+    try:
+        print(json.dumps(asyncio.run(_main(parser.parse_args())), indent=2))
+    finally:
+        shutdown_logging()
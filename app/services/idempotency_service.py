@@ -2,11 +2,15 @@ from app.schemas.webhook import WebhookEventCreate, WebhookEventResponse
 from app.crud import (
     webhook_events as webhook_events_crud
 )
+from app.core.metrics import observe_stage
+from app.services.webhook_event_writer import webhook_event_writer
 from sqlalchemy.orm import Session
 from typing import Optional
-import logging as logger
+import logging
 from fastapi import HTTPException,status
 
+logger = logging.getLogger(__name__)
+
 
 class IdempotencyService:
     async def create_webhook_event(
@@ -16,20 +20,17 @@ class IdempotencyService:
         ) -> WebhookEventResponse:
         try:
 
-            print(f"webhook_event_log: {webhook_event_log}")
-
-            existing_webhook = await webhook_events_crud.get_webhook_event_by_event_id(
-                db,
-                webhook_event_log.event_id
-            )
-            if existing_webhook:
+            with observe_stage("idempotency"):
+                if webhook_event_writer.is_running:
+                    webhook_event = await webhook_event_writer.submit(webhook_event_log)
+                else:
+                    webhook_event = await webhook_events_crud.create_webhook_event(db, webhook_event_log)
+            if not webhook_event:
                 logger.info(f"Webhook event log already exists: {webhook_event_log.event_id}")
                 return False
-            webhook_event = await webhook_events_crud.create_webhook_event(db, webhook_event_log)
-            if webhook_event:
-                return webhook_event
-            else:
-                logger.info(f"Error creating webhook_event log")
+            return webhook_event
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error getting subscription webhook_event: {str(e)}")
             raise HTTPException(
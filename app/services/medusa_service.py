@@ -1,17 +1,23 @@
 import logging
 import asyncio
+import json
+import time
 from typing import Any
 
-import httpx
-
 from app.core.config import settings
+from app.core.http import http_clients
+from app.core.metrics import UPSTREAM_REJECTIONS, observe_stage, track_outbound
 from app.core.redis import redis_client
+from app.core.resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, UpstreamUnavailableError
 from fastapi import status
 from app.schemas.common import GenericApiResponse
 
 logger = logging.getLogger(__name__)
 
 MEDUSA_TOKEN_KEY = "medusa:admin_token"
+MEDUSA_ORDER_PAYMENT_KEY = "medusa:order_payment:{order_id}"
+TOKEN_REFRESH_RETRY_DELAY = 30.0
+TOKEN_REFRESH_MAX_RETRY_DELAY = 600.0
 
 class MedusaService:
     def __init__(self):
@@ -19,47 +25,136 @@ class MedusaService:
         self.email = settings.MEDUSA_ADMIN_EMAIL
         self.password = settings.MEDUSA_ADMIN_PASSWORD
         self.token_ttl = settings.MEDUSA_TOKEN_CACHE_TTL
+        self.token_refresh_margin = settings.MEDUSA_TOKEN_REFRESH_MARGIN
+        self._token: str | None = None
+        self._token_expires_at = 0.0
+        self._auth_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+        self.payment_cache_ttl = settings.MEDUSA_PAYMENT_CACHE_TTL
+        self.breaker = CircuitBreaker(
+            name="medusa",
+            failure_rate=settings.MEDUSA_BREAKER_FAILURE_RATE,
+            slow_call_seconds=settings.MEDUSA_BREAKER_SLOW_CALL_SECONDS,
+            slow_call_rate=settings.MEDUSA_BREAKER_SLOW_CALL_RATE,
+            window_size=settings.MEDUSA_BREAKER_WINDOW,
+            min_calls=settings.MEDUSA_BREAKER_MIN_CALLS,
+            open_seconds=settings.MEDUSA_BREAKER_OPEN_SECONDS,
+            half_open_calls=settings.MEDUSA_BREAKER_HALF_OPEN_CALLS,
+        )
+        self.limiter = AdaptiveConcurrencyLimiter(
+            name="medusa",
+            initial_limit=settings.MEDUSA_CONCURRENCY_INITIAL,
+            min_limit=settings.MEDUSA_CONCURRENCY_MIN,
+            max_limit=settings.MEDUSA_CONCURRENCY_MAX,
+            latency_target=settings.MEDUSA_CONCURRENCY_LATENCY_TARGET,
+            queue_timeout=settings.MEDUSA_CONCURRENCY_QUEUE_TIMEOUT,
+        )
+
+    async def _send(self, method: str, url: str, **kwargs):
+        """
+        Sends one request to Medusa through the circuit breaker and the
+        adaptive concurrency limiter. Raises UpstreamUnavailableError without
+        touching the network when either rejects the call.
+        """
+        if not self.breaker.allow():
+            UPSTREAM_REJECTIONS.labels("medusa", "circuit_open").inc()
+            raise UpstreamUnavailableError("Medusa circuit breaker is open")
+        if not await self.limiter.acquire():
+            self.breaker.cancel()
+            UPSTREAM_REJECTIONS.labels("medusa", "concurrency_limit").inc()
+            raise UpstreamUnavailableError("Medusa concurrency limit reached")
+
+        success = False
+        start = time.perf_counter()
+        try:
+            with track_outbound("medusa"):
+                response = await http_clients.medusa.request(method, url, **kwargs)
+            success = response.status_code < status.HTTP_500_INTERNAL_SERVER_ERROR
+            return response
+        finally:
+            duration = time.perf_counter() - start
+            self.breaker.record(success, duration)
+            self.limiter.release(success, duration)
+
+    def _memory_token(self) -> str | None:
+        if self._token and time.monotonic() < self._token_expires_at:
+            return self._token
+        return None
+
+    def _remember_token(self, token: str, ttl: int) -> None:
+        self._token = token
+        self._token_expires_at = time.monotonic() + ttl
+
+    def token_expires_in(self) -> float:
+        """Seconds the in-memory admin token stays valid, 0 without one."""
+        if not self._token:
+            return 0.0
+        return max(self._token_expires_at - time.monotonic(), 0.0)
 
     async def _get_cached_token(self) -> str | None:
-        return await redis_client.get(MEDUSA_TOKEN_KEY)
+        token = await redis_client.get(MEDUSA_TOKEN_KEY)
+        if token:
+            ttl = await redis_client.ttl(MEDUSA_TOKEN_KEY)
+            self._remember_token(token, ttl if ttl and ttl > 0 else self.token_refresh_margin)
+        return token
     
     async def _cache_token(self, token: str) -> None:
+        self._remember_token(token, self.token_ttl)
         await redis_client.set(MEDUSA_TOKEN_KEY, token, ttl=self.token_ttl)
 
-    async def _clear_token(self) -> None:
+    async def _clear_token(self, stale_token: str | None = None) -> None:
+        if stale_token and stale_token != self._token:
+            return
+        self._token = None
+        self._token_expires_at = 0.0
         await redis_client.delete(MEDUSA_TOKEN_KEY)
 
-    async def authenticate(self, max_retries: int = 3) -> str | None:
-        cached_token = await self._get_cached_token()
-        if cached_token:
-            logger.info("Using cached medusa token")
-            return cached_token
+    async def authenticate(self, max_retries: int = 3, force_refresh: bool = False) -> str | None:
+        token = self._memory_token()
+        if token and not force_refresh:
+            return token
 
-        print(f"calling this: {self.base_url}/auth/user/emailpass")
+        async with self._auth_lock:
+            token = self._memory_token()
+            if token and not force_refresh:
+                return token
+
+            if not force_refresh:
+                cached_token = await self._get_cached_token()
+                if cached_token:
+                    logger.info("Using cached medusa token")
+                    return cached_token
+
+            return await self._login(max_retries)
+
+    async def _login(self, max_retries: int) -> str | None:
+        logger.info(f"Logging in to {self.base_url}/auth/user/emailpass")
 
         for attempt in range(max_retries):        
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{self.base_url}/auth/user/emailpass",
-                        json={
-                            "email": self.email,
-                            "password": self.password
-                        },
-                        timeout=30.0
-                    )
-
-                    if response.status_code == status.HTTP_200_OK:
-                        data = response.json()
-                        token = data.get("token")
-
-                        if token:
-                            await self._cache_token(token)
-                            logger.info("Medusa token cached")
-                            return token
-                        
-                    logger.warning(f"Medusa auth attempt {attempt + 1}/{max_retries} failed: {response.status_code}")
+                response = await self._send(
+                    "POST",
+                    f"{self.base_url}/auth/user/emailpass",
+                    json={
+                        "email": self.email,
+                        "password": self.password
+                    },
+                )
 
+                if response.status_code == status.HTTP_200_OK:
+                    data = response.json()
+                    token = data.get("token")
+
+                    if token:
+                        await self._cache_token(token)
+                        logger.info("Medusa token cached")
+                        return token
+                    
+                logger.warning(f"Medusa auth attempt {attempt + 1}/{max_retries} failed: {response.status_code}")
+
+            except UpstreamUnavailableError as e:
+                logger.warning(f"Medusa auth skipped: {e}")
+                return None
             except Exception as e:
                 logger.warning(f"Medusa auth attempt {attempt + 1}/{max_retries} error: {e}")
         
@@ -70,6 +165,46 @@ class MedusaService:
 
         logger.error(f"Medusa auth failed after {max_retries} attempts")
         return None
+
+    def start_token_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._token_refresh_loop())
+
+    async def stop_token_refresh(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+
+    async def _token_refresh_loop(self) -> None:
+        """
+        Replaces the token shortly before it expires so request paths keep
+        hitting the in-memory tier instead of waiting on a login. A login is
+        only forced while the token held is still valid but due; failed
+        refreshes back off exponentially up to TOKEN_REFRESH_MAX_RETRY_DELAY.
+        """
+        force_refresh = False
+        failures = 0
+        while True:
+            try:
+                token = await self.authenticate(force_refresh=force_refresh)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Medusa token refresh error: {e}")
+                token = None
+
+            if token:
+                failures = 0
+                delay = max(self.token_expires_in() - self.token_refresh_margin, 1.0)
+            else:
+                failures += 1
+                delay = min(TOKEN_REFRESH_RETRY_DELAY * 2 ** (failures - 1), TOKEN_REFRESH_MAX_RETRY_DELAY)
+                logger.warning(f"Medusa token refresh failed {failures} time(s), retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            # Once the token has expired (or was never obtained), a plain
+            # authenticate() first picks up one another replica stored
+            force_refresh = 0 < self.token_expires_in() <= self.token_refresh_margin
         
     async def execute_request(
         self,
@@ -80,8 +215,16 @@ class MedusaService:
         retry_on_401: bool = True,
     ) -> GenericApiResponse:
         
-        token = await self.authenticate()
+        with observe_stage("medusa_auth"):
+            token = await self.authenticate()
         if not token:
+            if self.breaker.state == CircuitBreaker.OPEN:
+                return GenericApiResponse(
+                    success=False,
+                    message="Medusa is unavailable",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    data=None
+                )
             return GenericApiResponse(
                 success=False,
                 message="Authentication Failed",
@@ -93,53 +236,59 @@ class MedusaService:
         headers = {"Authorization": f"Bearer {token}"}
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.request(
+            response = await self._send(
+                method,
+                url,
+                json=payload,
+                params=params,
+                headers=headers
+            )
+
+            if response.status_code == status.HTTP_401_UNAUTHORIZED and retry_on_401:
+                await self._clear_token(token)
+                logger.warning("Token expired, retrying")
+                return await self.execute_request(
+                    endpoint=endpoint,
                     method=method,
-                    url=url,
-                    json=payload,
+                    payload=payload,
                     params=params,
-                    headers=headers,
-                    timeout=30.0
+                    retry_on_401=False
                 )
-
-                if response.status_code == status.HTTP_401_UNAUTHORIZED and retry_on_401:
-                    await self._clear_token()
-                    logger.warning("Token expired, retrying")
-                    return await self.execute_request(
-                        endpoint=endpoint,
-                        method=method,
-                        payload=payload,
-                        params=params,
-                        retry_on_401=False
-                    )
-                
-                if response.status_code in [status.HTTP_201_CREATED, status.HTTP_200_OK, status.HTTP_204_NO_CONTENT]:
-                    data = {}
-                    if response.status_code != status.HTTP_204_NO_CONTENT and response.text.strip():
-                        data = response.json()
-
-                    return GenericApiResponse(
-                        success=True,
-                        message=f"Calling {endpoint} successful",
-                        status_code=response.status_code,
-                        data=data
-                    ) 
-                
-                error_data = {}
-                if response.text.strip():
-                    try:
-                        error_data = response.json()
-                    except Exception:
-                        error_data = {"message": response.text}
+            
+            if response.status_code in [status.HTTP_201_CREATED, status.HTTP_200_OK, status.HTTP_204_NO_CONTENT]:
+                data = {}
+                if response.status_code != status.HTTP_204_NO_CONTENT and response.text.strip():
+                    data = response.json()
 
                 return GenericApiResponse(
-                    success=False,
-                    message=f"Request to {endpoint} failed",
+                    success=True,
+                    message=f"Calling {endpoint} successful",
                     status_code=response.status_code,
-                    data=error_data
-                )
+                    data=data
+                ) 
+            
+            error_data = {}
+            if response.text.strip():
+                try:
+                    error_data = response.json()
+                except Exception:
+                    error_data = {"message": response.text}
+
+            return GenericApiResponse(
+                success=False,
+                message=f"Request to {endpoint} failed",
+                status_code=response.status_code,
+                data=error_data
+            )
 
+        except UpstreamUnavailableError as e:
+            logger.warning(f"Request to {endpoint} rejected: {e}")
+            return GenericApiResponse(
+                success=False,
+                message=f"Request to {endpoint} failed: {str(e)}",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                data=None
+            )
         except Exception as e:
             logger.error(f"Request error: {e}")
             return GenericApiResponse(
@@ -149,42 +298,127 @@ class MedusaService:
                 data=None
             )
 
-    async def get_payment_by_order(self, order_id: str) -> dict | None:
-        result = await self.execute_request(
-            endpoint=f"/admin/orders/{order_id}",
-            method="GET",
-            params={"fields": "+payment_collection"}
+    # Payments are invalidated after a capture, and a replica serving its own
+    # stale copy would capture again, so they skip the process-local tier
+    async def _get_cached_payment(self, order_id: str) -> dict | None:
+        cached = await redis_client.get(MEDUSA_ORDER_PAYMENT_KEY.format(order_id=order_id), local=False)
+        if cached:
+            return json.loads(cached)
+        return None
+
+    async def _cache_payment(self, order_id: str, payment: dict) -> None:
+        await redis_client.set(
+            MEDUSA_ORDER_PAYMENT_KEY.format(order_id=order_id),
+            json.dumps(payment),
+            ttl=self.payment_cache_ttl,
+            local=False,
         )
 
-        # print(f"get_payment_by_order result: {result}")
+    async def _cache_payments(self, payments: dict[str, dict]) -> None:
+        await redis_client.mset(
+            {
+                MEDUSA_ORDER_PAYMENT_KEY.format(order_id=order_id): json.dumps(payment)
+                for order_id, payment in payments.items()
+            },
+            ttl=self.payment_cache_ttl,
+            local=False,
+        )
+
+    async def invalidate_payment(self, order_id: str) -> None:
+        await redis_client.delete(MEDUSA_ORDER_PAYMENT_KEY.format(order_id=order_id))
+
+    async def prefetch_payment(self, order_id: str) -> None:
+        """
+        Warms the order -> payment cache so the settle_ok webhook can capture
+        without fetching the order first.
+        """
+        try:
+            await self.get_payment_by_order(order_id)
+        except Exception as e:
+            logger.warning(f"Payment prefetch failed for order {order_id}: {e}")
+
+    async def get_payment_by_order(self, order_id: str, use_cache: bool = True) -> dict | None:
+        if use_cache:
+            cached_payment = await self._get_cached_payment(order_id)
+            if cached_payment:
+                logger.debug(f"Using cached payment for order: {order_id}")
+                return cached_payment
+
+        with observe_stage("get_payment_by_order"):
+            result = await self.execute_request(
+                endpoint=f"/admin/orders/{order_id}",
+                method="GET",
+                params={"fields": "+payment_collection"}
+            )
 
         if not result.success:
             logger.error(f"Get order failed: {result.message}")
             return None
         
-        order = result.data.get("order", {})
+        payment = self._extract_payment(result.data.get("order", {}))
+        if payment:
+            await self._cache_payment(order_id, payment)
+            return payment
+        
+        logger.warning(f"No payment found for order: {order_id}")
+        return None
+
+    def _extract_payment(self, order: dict) -> dict | None:
         payment_collections = order.get("payment_collections", [])
 
         if payment_collections:
             payments = payment_collections[0].get("payments", [])
-            print(f"payments: {payments}")
+            logger.debug(f"payments: {payments}")
             if payments:
                 return {
                     "payment_id": payments[0].get("id"),
                     "amount": payments[0].get("amount"),
                     "currency_code": payments[0].get("currency_code"),
+                    "captured_at": payments[0].get("captured_at"),
                 }
-        
-        logger.warning(f"No payment found for order: {order_id}")
         return None
+
+    async def get_payments_by_orders(self, order_ids: list[str], batch_size: int = 100) -> dict[str, dict]:
+        """
+        Looks up the payments of many orders with the list endpoint, filtered
+        by id, one request per `batch_size` orders instead of one per order.
+        Orders that could not be fetched or have no payment are left out.
+        """
+        payments: dict[str, dict] = {}
+        for start in range(0, len(order_ids), batch_size):
+            batch = order_ids[start:start + batch_size]
+            with observe_stage("get_payments_by_orders"):
+                result = await self.execute_request(
+                    endpoint="/admin/orders",
+                    method="GET",
+                    params={
+                        "id[]": batch,
+                        "fields": "id,*payment_collections,*payment_collections.payments",
+                        "limit": len(batch),
+                    }
+                )
+
+            if not result.success:
+                logger.error(f"List orders failed for {len(batch)} orders: {result.message}")
+                continue
+
+            fetched = {}
+            for order in result.data.get("orders", []):
+                payment = self._extract_payment(order)
+                if payment:
+                    fetched[order.get("id")] = payment
+            await self._cache_payments(fetched)
+            payments.update(fetched)
+        return payments
     
     async def capture_payment(self, payment_id: str) -> dict | None:
-        result = await self.execute_request(
-            endpoint=f"/admin/payments/{payment_id}/capture",
-            method="POST"
-        ) 
+        with observe_stage("capture_payment"):
+            result = await self.execute_request(
+                endpoint=f"/admin/payments/{payment_id}/capture",
+                method="POST"
+            )
 
-        print(f"capture_payment result: {result}")
+        logger.debug(f"capture_payment result: {result}")
 
         if not result.success:
             logger.error(f"Capture failed: {result.message}")
@@ -192,13 +426,20 @@ class MedusaService:
 
         logger.info(f"Payment captured: {payment_id}")
 
-        print(f"result.data {result.data.get("payment")}")
-
         return result.data.get("payment")
     
+    def _already_settled(self, order_id: str) -> GenericApiResponse:
+        logger.info(f"Payment for order {order_id} already captured")
+        return GenericApiResponse(
+            success=True,
+            message=f"{order_id} already settled",
+            status_code=status.HTTP_200_OK,
+            data=None
+        )
+
     async def process_settle_ok(self, order_id: str) -> GenericApiResponse | None:
 
-        print("Processing!!! process_settle_ok")
+        logger.info(f"Processing settle_ok for order {order_id}")
 
         get_payment_by_order = await self.get_payment_by_order(order_id)
 
@@ -206,16 +447,27 @@ class MedusaService:
             logger.error("Failed to get payment")
             return None
         
+        if get_payment_by_order.get("captured_at"):
+            return self._already_settled(order_id)
+
         payment_id = get_payment_by_order.get("payment_id")
         capture_payment = await self.capture_payment(payment_id)
 
+        if not capture_payment:
+            await self.invalidate_payment(order_id)
+            refreshed_payment = await self.get_payment_by_order(order_id, use_cache=False)
+            if refreshed_payment and refreshed_payment.get("captured_at"):
+                # Captured meanwhile by another replica or path
+                return self._already_settled(order_id)
+            if refreshed_payment and refreshed_payment.get("payment_id") != payment_id:
+                capture_payment = await self.capture_payment(refreshed_payment.get("payment_id"))
+
         if not capture_payment:
             logger.error("Failed to capture payment")
             return None
-        
-        print('axeee process_settle_ok')
-        print(order_id)
 
+        await self.invalidate_payment(order_id)
+        
         return GenericApiResponse(
             success=True,
             message=f"{order_id} successfully settled",
@@ -0,0 +1,124 @@
+import asyncio
+import contextvars
+import logging
+import zlib
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+from app.core.metrics import ORDER_LANE_BACKLOG
+
+logger = logging.getLogger(__name__)
+
+
+class OrderLaneDispatcher:
+    """
+    Shards work by a stable hash of the Medusa order id onto a fixed set of
+    lanes, each drained by a single task. Work for one order therefore runs
+    strictly in submission order (an auth_ok and a settle_ok that arrive
+    together can no longer race inside process_settle_ok), while different
+    orders run in parallel across lanes.
+
+    Ordering holds within this process; replicas each have their own lanes.
+    """
+
+    def __init__(self):
+        self.lane_count = settings.WEBHOOK_ORDER_LANES
+        self.queue_size = settings.WEBHOOK_ORDER_LANE_QUEUE_SIZE
+        self.shutdown_timeout = settings.WEBHOOK_ORDER_LANE_SHUTDOWN_TIMEOUT
+        self._queues: list[asyncio.Queue] = []
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    def lane_for(self, order_id: str) -> int:
+        return zlib.crc32(order_id.encode("utf-8")) % self.lane_count
+
+    def start(self) -> None:
+        if self.is_running or self.lane_count <= 0:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.lane_count)]
+        self._workers = [
+            asyncio.create_task(self._drain(queue))
+            for queue in self._queues
+        ]
+        logger.info(f"Started {self.lane_count} order processing lanes")
+
+    async def stop(self) -> None:
+        """
+        Lets each lane finish its backlog for up to
+        WEBHOOK_ORDER_LANE_SHUTDOWN_TIMEOUT, then cancels what is left. A
+        full lane is cancelled straight away rather than blocking shutdown
+        on the sentinel put; work still queued there is cancelled too.
+        """
+        if not self.is_running:
+            return
+        for queue, worker in zip(self._queues, self._workers):
+            try:
+                queue.put_nowait(None)
+            except asyncio.QueueFull:
+                worker.cancel()
+        _, pending = await asyncio.wait(self._workers, timeout=self.shutdown_timeout)
+        for worker in pending:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+        abandoned = 0
+        for queue in self._queues:
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    continue
+                ORDER_LANE_BACKLOG.dec()
+                item[3].cancel()
+                abandoned += 1
+        if pending or abandoned:
+            logger.warning(
+                f"Order lanes stopped with {len(pending)} lane(s) cancelled and {abandoned} queued item(s) dropped"
+            )
+        self._workers = []
+        self._queues = []
+        logger.info("Order processing lanes stopped")
+
+    async def run(self, order_id: str, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """
+        Runs func(*args) on the lane owning order_id and returns its result.
+        Falls back to running it directly when the lanes are not started.
+        """
+        if not self.is_running:
+            return await func(*args)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queues[self.lane_for(order_id)].put(
+            (func, args, contextvars.copy_context(), future)
+        )
+        ORDER_LANE_BACKLOG.inc()
+        return await future
+
+    async def _drain(self, queue: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            ORDER_LANE_BACKLOG.dec()
+
+            func, args, context, future = item
+            if future.cancelled():
+                continue
+            try:
+                # Run in the submitter's context so request/event ids stay on the logs
+                result = await asyncio.create_task(func(*args), context=context)
+            except asyncio.CancelledError:
+                # Lane cancelled at shutdown; don't leave the submitter waiting
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+                continue
+            if not future.cancelled():
+                future.set_result(result)
+
+
+order_lanes = OrderLaneDispatcher()
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+import orjson
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import get_engine
+from app.core.http import http_clients
+from app.core.metrics import READINESS_CHECK_LATENCY, READINESS_CHECK_UP
+from app.core.redis import redis_client
+from app.services.medusa_service import medusa_service
+
+logger = logging.getLogger(__name__)
+
+# Without these the app cannot process webhooks; the others only degrade it
+REQUIRED_CHECKS = ("database", "medusa")
+
+STARTING = orjson.dumps({"status": "starting", "checks": {}})
+
+
+class ReadinessService:
+    """
+    Deep readiness snapshot refreshed in the background.
+
+    Every READINESS_REFRESH_INTERVAL seconds the DB, Redis, Medusa and the
+    Medusa admin token are checked concurrently (each bounded by
+    READINESS_CHECK_TIMEOUT) and the result is encoded once. /ready only
+    returns those bytes, so probe frequency never turns into load on
+    Postgres or Medusa. A snapshot older than READINESS_STALE_AFTER means the
+    refresher is stuck and is reported as not ready.
+    """
+
+    def __init__(self):
+        self.interval = settings.READINESS_REFRESH_INTERVAL
+        self.timeout = settings.READINESS_CHECK_TIMEOUT
+        self.stale_after = settings.READINESS_STALE_AFTER
+        self.snapshot: dict[str, Any] | None = None
+        self._encoded = STARTING
+        self._status_code = 503
+        self._refreshed_at = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Readiness refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def current(self) -> tuple[int, bytes]:
+        if self.snapshot is not None and time.monotonic() - self._refreshed_at > self.stale_after:
+            return 503, orjson.dumps({**self.snapshot, "status": "stale"})
+        return self._status_code, self._encoded
+
+    async def refresh(self) -> dict[str, Any]:
+        names = ("database", "redis", "medusa", "medusa_token")
+        results = await asyncio.gather(
+            self._timed("database", self._check_database),
+            self._timed("redis", self._check_redis),
+            self._timed("medusa", self._check_medusa),
+            self._timed("medusa_token", self._check_medusa_token),
+        )
+        checks = dict(zip(names, results))
+
+        if not all(checks[name]["ok"] for name in REQUIRED_CHECKS):
+            status, status_code = "not_ready", 503
+        elif not all(check["ok"] for check in checks.values()):
+            status, status_code = "degraded", 200
+        else:
+            status, status_code = "ready", 200
+
+        snapshot = {
+            "status": status,
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "checks": checks,
+        }
+        if status != (self.snapshot or {}).get("status"):
+            log = logger.info if status_code == 200 else logger.warning
+            log(f"Readiness changed to {status}")
+        self.snapshot = snapshot
+        self._encoded = orjson.dumps(snapshot)
+        self._status_code = status_code
+        self._refreshed_at = time.monotonic()
+        return snapshot
+
+    async def _timed(self, name: str, check) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(check(), self.timeout)
+            error = None
+        except asyncio.TimeoutError:
+            result, error = {"ok": False}, f"timed out after {self.timeout}s"
+        except Exception as e:
+            result, error = {"ok": False}, str(e) or type(e).__name__
+        latency = time.perf_counter() - start
+
+        READINESS_CHECK_UP.labels(name).set(1 if result["ok"] else 0)
+        READINESS_CHECK_LATENCY.labels(name).set(latency)
+        result["latency_ms"] = round(latency * 1000, 3)
+        if error:
+            result["error"] = error
+        return result
+
+    async def _check_database(self) -> dict[str, Any]:
+        async with get_engine().connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        return {"ok": True}
+
+    async def _check_redis(self) -> dict[str, Any]:
+        return {"ok": await redis_client.ping()}
+
+    async def _check_medusa(self) -> dict[str, Any]:
+        response = await http_clients.get("medusa").get(f"{medusa_service.base_url}/health")
+        return {
+            "ok": response.status_code < 500,
+            "status_code": response.status_code,
+            "circuit": medusa_service.breaker.state,
+        }
+
+    async def _check_medusa_token(self) -> dict[str, Any]:
+        expires_in = medusa_service.token_expires_in()
+        return {"ok": expires_in > 0, "expires_in_s": round(expires_in, 1)}
+
+
+readiness_service = ReadinessService()
@@ -1,29 +1,68 @@
 
+import asyncio
+import hashlib
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
-import httpx
-from solidgate import ApiClient
-
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.http import http_clients
+from app.core.metrics import track_outbound
+from app.core.redis import redis_client
 from app.core.security import SignatureService
+from app.schemas.payment import PaymentInitializeRequest
+from app.schemas.solidgate import SolidgateWebhookPayload
 
 logger = logging.getLogger(__name__)
 
+PAYMENT_INTENT_KEY = "solidgate:payment_intent:{intent_hash}"
+
 
 class SolidgateService:
     def __init__(self):
         self.public_key = settings.SOLIDGATE_PUBLIC_KEY
         self.secret_key = settings.SOLIDGATE_SECRET_KEY
-        self.client = ApiClient(self.public_key, self.secret_key)
+        self._client = None
         self.signature_service = SignatureService(self.public_key, self.secret_key)
+        # Webhooks are signed with their own key pair, never the API keys;
+        # settings refuse to start with verification on and these unset
+        self.webhook_signature_service = SignatureService(
+            settings.SOLIDGATE_WEBHOOK_PUBLIC_KEY,
+            settings.SOLIDGATE_WEBHOOK_SECRET_KEY,
+        ) if settings.SOLIDGATE_WEBHOOK_VERIFY_SIGNATURE else None
+        self._intent_executor: ThreadPoolExecutor | None = None
+        self.intent_cache_ttl = settings.PAYMENT_INTENT_CACHE_TTL
+        self._intent_cache = TTLCache(
+            max_size=settings.PAYMENT_INTENT_CACHE_MAX_SIZE,
+            ttl=self.intent_cache_ttl,
+        )
+
+    async def shutdown(self) -> None:
+        """Waits for in-flight intent chunks and stops the batch worker threads."""
+        executor, self._intent_executor = self._intent_executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True)
+            logger.info("Payment intent executor stopped")
+
+    @property
+    def client(self):
+        # The SDK pulls in requests and its crypto helpers; only intent
+        # creation needs it, so it is loaded on first use instead of at import.
+        if self._client is None:
+            from solidgate import ApiClient
+
+            self._client = ApiClient(self.public_key, self.secret_key)
+        return self._client
 
     def generate_signature(self, payload: str, method: str = "POST") -> str:
         return self.signature_service.generate_signature(payload, method)
 
-    def verify_webhook_signature(self, payload: str, signature: str) -> bool:
-        return self.signature_service.verify_signature(payload, signature)
+    def verify_webhook_signature(self, payload: str | bytes, signature: str) -> bool:
+        if self.webhook_signature_service is None:
+            return False
+        return self.webhook_signature_service.verify_signature(payload, signature)
 
     async def execute_request(
         self,
@@ -31,61 +70,61 @@ class SolidgateService:
         payload: dict[str, Any] | None = None,
         method: str = "POST"
     ) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            payload_json = ""
-            if payload:
-                payload_json = json.dumps(
-                    payload,
-                    separators=(",", ":"),
-                    sort_keys=True,
-                    ensure_ascii=True
-                )
-
-            signature = self.generate_signature(payload_json, method)
-
-            headers = {
-                "Content-Type": "application/json",
-                "merchant": self.public_key,
-                "Signature": signature
-            }
+        client = http_clients.solidgate
+        payload_json = ""
+        if payload:
+            payload_json = json.dumps(
+                payload,
+                separators=(",", ":"),
+                sort_keys=True,
+                ensure_ascii=True
+            )
 
-            try:
+        signature = self.generate_signature(payload_json, method)
+
+        headers = {
+            "Content-Type": "application/json",
+            "merchant": self.public_key,
+            "Signature": signature
+        }
+
+        try:
+            with track_outbound("solidgate"):
                 if method == "GET":
-                    response = await client.get(endpoint, headers=headers, timeout=30.0)
+                    response = await client.get(endpoint, headers=headers)
                 elif method == "DELETE":
-                    response = await client.delete(endpoint, headers=headers, timeout=30.0)
+                    response = await client.delete(endpoint, headers=headers)
                 else:
                     response = await client.request(
                         method=method,
                         url=endpoint,
                         content=payload_json,
-                        headers=headers,
-                        timeout=30.0
+                        headers=headers
                     )
 
-                if response.status_code in [200, 201, 204]:
-                    result_data = {}
-                    if response.status_code != 204 and response.text.strip():
-                        try:
-                            result_data = response.json()
-                        except Exception:
-                            result_data = {}
-
-                    if "error" in result_data:
-                        return {"success": False, "status_code": response.status_code, "data": result_data}
-
-                    return {"success": True, "status_code": response.status_code, "data": result_data}
-                else:
+            if response.status_code in [200, 201, 204]:
+                result_data = {}
+                if response.status_code != 204 and response.text.strip():
                     try:
-                        result_data = response.json() if response.text.strip() else {"error": f"HTTP {response.status_code}"}
+                        result_data = response.json()
                     except Exception:
-                        result_data = {"error": f"HTTP {response.status_code}"}
+                        result_data = {}
 
+                if "error" in result_data:
                     return {"success": False, "status_code": response.status_code, "data": result_data}
 
-            except Exception as e:
-                logger.error(f"Request error: {e}")
-                return {"success": False, "status_code": 0, "error": {"message": str(e)}}
+                return {"success": True, "status_code": response.status_code, "data": result_data}
+            else:
+                try:
+                    result_data = response.json() if response.text.strip() else {"error": f"HTTP {response.status_code}"}
+                except Exception:
+                    result_data = {"error": f"HTTP {response.status_code}"}
+
+                return {"success": False, "status_code": response.status_code, "data": result_data}
+
+        except Exception as e:
+            logger.error(f"Request error: {e}")
+            return {"success": False, "status_code": 0, "error": {"message": str(e)}}
 
     def create_payment_intent(
         self,
@@ -109,29 +148,190 @@ class SolidgateService:
 
         merchant_data = self.client.form_merchant_data(intent)
 
-        print(f"merchant_data: {merchant_data}")
-
         return {
             "payment_intent": merchant_data.payment_intent,
             "merchant": merchant_data.merchant,
             "signature": merchant_data.signature,
         }
 
+    def _payment_intent_hash(
+        self,
+        order_id: str,
+        amount: int,
+        currency: str,
+        customer_email: str,
+        order_description: str = "Payment",
+        success_url: str | None = None,
+        fail_url: str | None = None,
+    ) -> str:
+        key = json.dumps([
+            order_id,
+            amount,
+            currency,
+            customer_email,
+            order_description,
+            success_url or settings.SOLIDGATE_SUCCESS_URL,
+            fail_url or settings.SOLIDGATE_FAIL_URL,
+        ])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    async def _get_cached_payment_intent(self, intent_hash: str) -> dict[str, Any] | None:
+        if self.intent_cache_ttl <= 0:
+            return None
+
+        intent = self._intent_cache.get(intent_hash)
+        if intent:
+            return intent
+
+        if settings.PAYMENT_INTENT_CACHE_REDIS:
+            cached = await redis_client.get(PAYMENT_INTENT_KEY.format(intent_hash=intent_hash))
+            if cached:
+                intent = json.loads(cached)
+                self._intent_cache.set(intent_hash, intent)
+                return intent
+        return None
+
+    async def _cache_payment_intent(self, intent_hash: str, intent: dict[str, Any]) -> None:
+        if self.intent_cache_ttl <= 0:
+            return
+
+        self._intent_cache.set(intent_hash, intent)
+        if settings.PAYMENT_INTENT_CACHE_REDIS:
+            await redis_client.set(
+                PAYMENT_INTENT_KEY.format(intent_hash=intent_hash),
+                json.dumps(intent),
+                ttl=self.intent_cache_ttl,
+            )
+
+    async def _get_cached_payment_intents(self, intent_hashes: list[str]) -> list[dict[str, Any] | None]:
+        if self.intent_cache_ttl <= 0:
+            return [None] * len(intent_hashes)
+
+        intents = [self._intent_cache.get(intent_hash) for intent_hash in intent_hashes]
+        missing = [index for index, intent in enumerate(intents) if intent is None]
+        if missing and settings.PAYMENT_INTENT_CACHE_REDIS:
+            cached = await redis_client.mget([
+                PAYMENT_INTENT_KEY.format(intent_hash=intent_hashes[index]) for index in missing
+            ])
+            for index, value in zip(missing, cached):
+                if value:
+                    intents[index] = json.loads(value)
+                    self._intent_cache.set(intent_hashes[index], intents[index])
+        return intents
+
+    async def _cache_payment_intents(self, intents: dict[str, dict[str, Any]]) -> None:
+        if self.intent_cache_ttl <= 0 or not intents:
+            return
+
+        for intent_hash, intent in intents.items():
+            self._intent_cache.set(intent_hash, intent)
+        if settings.PAYMENT_INTENT_CACHE_REDIS:
+            await redis_client.mset(
+                {
+                    PAYMENT_INTENT_KEY.format(intent_hash=intent_hash): json.dumps(intent)
+                    for intent_hash, intent in intents.items()
+                },
+                ttl=self.intent_cache_ttl,
+            )
+
+    async def get_or_create_payment_intent(
+        self,
+        order_id: str,
+        amount: int,
+        currency: str,
+        customer_email: str,
+    ) -> dict[str, Any]:
+        """
+        Memoized create_payment_intent: repeated initialize calls for the same
+        order parameters reuse the encrypted and signed intent.
+        """
+        intent_hash = self._payment_intent_hash(order_id, amount, currency, customer_email)
+        intent = await self._get_cached_payment_intent(intent_hash)
+        if intent:
+            return intent
+
+        intent = self.create_payment_intent(
+            order_id=order_id,
+            amount=amount,
+            currency=currency,
+            customer_email=customer_email,
+        )
+        await self._cache_payment_intent(intent_hash, intent)
+        return intent
+
+    def _create_payment_intents_chunk(
+        self,
+        items: list[PaymentInitializeRequest],
+    ) -> list[dict[str, Any] | Exception]:
+        results: list[dict[str, Any] | Exception] = []
+        for item in items:
+            try:
+                results.append(self.create_payment_intent(
+                    order_id=item.order_id,
+                    amount=item.amount,
+                    currency=item.currency,
+                    customer_email=item.customer_email,
+                ))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def create_payment_intents(
+        self,
+        items: list[PaymentInitializeRequest],
+    ) -> list[dict[str, Any] | Exception]:
+        """
+        Generates merchant data for many intents on a thread pool so the event
+        loop stays free. Cached intents are reused; the misses are split into
+        one chunk per worker to keep the per-task overhead low. Failures are
+        returned in place as exceptions.
+        """
+        intent_hashes = [
+            self._payment_intent_hash(item.order_id, item.amount, item.currency, item.customer_email)
+            for item in items
+        ]
+        results: list[dict[str, Any] | Exception | None] = await self._get_cached_payment_intents(intent_hashes)
+        misses = [index for index, intent in enumerate(results) if intent is None]
+
+        if not misses:
+            return results
+
+        if self._intent_executor is None:
+            self._intent_executor = ThreadPoolExecutor(
+                max_workers=settings.PAYMENT_BATCH_WORKERS,
+                thread_name_prefix="payment-intent",
+            )
+
+        missing_items = [items[index] for index in misses]
+        workers = settings.PAYMENT_BATCH_WORKERS
+        chunk_size = max(-(-len(missing_items) // workers), 1)
+        chunks = [missing_items[i:i + chunk_size] for i in range(0, len(missing_items), chunk_size)]
+
+        loop = asyncio.get_running_loop()
+        chunk_results = await asyncio.gather(*(
+            loop.run_in_executor(self._intent_executor, self._create_payment_intents_chunk, chunk)
+            for chunk in chunks
+        ))
+        created = [result for chunk_result in chunk_results for result in chunk_result]
+
+        for index, intent in zip(misses, created):
+            results[index] = intent
+        await self._cache_payment_intents({
+            intent_hashes[index]: intent
+            for index, intent in zip(misses, created)
+            if not isinstance(intent, Exception)
+        })
+        return results
+
     async def check_order_status(self, order_id: str) -> dict[str, Any]:
         return await self.execute_request(
-            endpoint="https://pay.solidgate.com/api/v1/status",
+            endpoint=f"{settings.SOLIDGATE_API_URL}/status",
             payload={"order_id": order_id},
             method="POST"
         )
 
-    def extract_order_id(self, webhook_payload: dict) -> str | None:
-        return webhook_payload.get("order", {}).get("order_id")
-
-    def extract_order_status(self, webhook_payload: dict) -> str | None:
-        return webhook_payload.get("order", {}).get("status")
-
-    def extract_payment_token(self, webhook_payload: dict) -> str | None:
-        return webhook_payload.get("transaction", {}).get("card_token", {}).get("token")
+    def parse_webhook(self, raw_body: bytes) -> SolidgateWebhookPayload:
+        return SolidgateWebhookPayload.model_validate_json(raw_body)
 
 
 solidgate_service = SolidgateService()
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+Polls Solidgate for the status of recently initialized orders that never got
+a terminal webhook, and feeds what it finds through the webhook processing
+path.
+
+Runs periodically from the app when SOLIDGATE_STATUS_POLL_INTERVAL > 0, or
+on demand:
+
+    python -m app.services.solidgate_status_poller --max-orders 1000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import SOLIDGATE_STATUS_POLLS
+from app.core.resilience import AsyncRateLimiter
+from app.crud import payment_initializations as payment_initializations_crud
+from app.crud.payment_initializations import TERMINAL_ORDER_STATUSES
+from app.schemas.solidgate import SolidgateWebhookPayload
+from app.schemas.webhook import WebhookEventCreate
+from app.services.idempotency_service import idempotency_service
+from app.services.solidgate_service import solidgate_service
+from app.services.webhook_retry_service import process_webhook_event, webhook_retry_service
+
+logger = logging.getLogger(__name__)
+
+
+class SolidgateStatusPoller:
+    """
+    Each sweep claims unresolved orders a page at a time (oldest first, see
+    claim_unresolved_payment_initializations) and checks them with
+    `workers` concurrent requests, all drawing from one token bucket so the
+    sweep never exceeds SOLIDGATE_STATUS_RATE_LIMIT requests per second. A
+    429 pauses the bucket for SOLIDGATE_STATUS_RETRY_AFTER seconds.
+
+    A terminal status is stored as an "order.status_poll" webhook event keyed
+    by order and status, so a poll and a late webhook for the same outcome
+    are both recorded but settle_ok only captures once (process_settle_ok
+    skips payments that are already captured).
+    """
+
+    def __init__(self):
+        self.interval = settings.SOLIDGATE_STATUS_POLL_INTERVAL
+        self.min_age = timedelta(seconds=settings.SOLIDGATE_STATUS_POLL_MIN_AGE)
+        self.lookback = timedelta(hours=settings.SOLIDGATE_STATUS_POLL_LOOKBACK_HOURS)
+        self.recheck = timedelta(seconds=settings.SOLIDGATE_STATUS_POLL_RECHECK)
+        self.page_size = settings.SOLIDGATE_STATUS_POLL_PAGE_SIZE
+        self.max_orders = settings.SOLIDGATE_STATUS_POLL_MAX_ORDERS
+        self.workers = settings.SOLIDGATE_STATUS_POLL_WORKERS
+        self.retry_after = settings.SOLIDGATE_STATUS_RETRY_AFTER
+        self.rate_limiter = AsyncRateLimiter(
+            settings.SOLIDGATE_STATUS_RATE_LIMIT,
+            settings.SOLIDGATE_STATUS_RATE_BURST,
+        )
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def start(self) -> None:
+        if self._task is not None or not self.enabled:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Solidgate status poller started")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("Solidgate status poller stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Solidgate status sweep failed: {e}")
+
+    async def record_initializations(self, initializations: list[dict]) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await payment_initializations_crud.record_payment_initializations(db, initializations)
+        except Exception as e:
+            logger.error(f"Failed to record payment initializations: {e}")
+
+    async def sweep(self, max_orders: int | None = None) -> dict[str, Any]:
+        started = time.perf_counter()
+        max_orders = max_orders or self.max_orders
+        outcomes: Counter[str] = Counter()
+        checked = 0
+
+        while checked < max_orders:
+            now = datetime.now(timezone.utc)
+            async with AsyncSessionLocal() as db:
+                order_ids = await payment_initializations_crud.claim_unresolved_payment_initializations(
+                    db,
+                    created_from=now - self.lookback,
+                    created_before=now - self.min_age,
+                    checked_before=now - self.recheck,
+                    limit=min(self.page_size, max_orders - checked),
+                )
+            if not order_ids:
+                break
+            checked += len(order_ids)
+
+            queue: asyncio.Queue[str] = asyncio.Queue()
+            for order_id in order_ids:
+                queue.put_nowait(order_id)
+            resolved: list[str] = []
+
+            async def worker() -> None:
+                while not queue.empty():
+                    order_id = queue.get_nowait()
+                    outcome = await self._check(order_id)
+                    outcomes[outcome] += 1
+                    SOLIDGATE_STATUS_POLLS.labels(outcome).inc()
+                    if outcome in ("processed", "failed", "logged", "duplicate"):
+                        resolved.append(order_id)
+
+            await asyncio.gather(*(worker() for _ in range(min(self.workers, len(order_ids)))))
+
+            async with AsyncSessionLocal() as db:
+                await payment_initializations_crud.mark_payment_initializations_resolved(db, resolved)
+
+        elapsed = time.perf_counter() - started
+        report = {
+            "checked": checked,
+            **{outcome: outcomes[outcome] for outcome in (
+                "pending", "processed", "logged", "duplicate", "failed", "rate_limited", "error"
+            )},
+            "elapsed_s": round(elapsed, 3),
+            "orders_per_second": round(checked / elapsed, 2) if elapsed else 0.0,
+        }
+        logger.info(
+            f"Solidgate status sweep: {checked} checked, {outcomes['processed']} processed, "
+            f"{outcomes['logged']} logged, {outcomes['pending']} pending, "
+            f"{outcomes['failed'] + outcomes['rate_limited'] + outcomes['error']} failed in {elapsed:.2f}s"
+        )
+        return report
+
+    async def _check(self, order_id: str) -> str:
+        """
+        Checks one order and returns the outcome: "pending" (not terminal
+        yet), "processed"/"failed" (settle_ok handed to processing),
+        "logged" (other terminal status), "duplicate" (already recorded),
+        "rate_limited" or "error" (status request failed).
+        """
+        await self.rate_limiter.acquire()
+        try:
+            result = await solidgate_service.check_order_status(order_id)
+        except Exception as e:
+            logger.error(f"Status check failed for order {order_id}: {e}")
+            return "error"
+
+        if not result.get("success"):
+            if result.get("status_code") == 429:
+                logger.warning(f"Solidgate rate limited status checks, pausing {self.retry_after}s")
+                self.rate_limiter.pause(self.retry_after)
+                return "rate_limited"
+            logger.warning(f"Status check failed for order {order_id}: {result.get('status_code')}")
+            return "error"
+
+        data = result.get("data") or {}
+        try:
+            order_status = SolidgateWebhookPayload.model_validate(data).order_status
+        except ValidationError:
+            logger.warning(f"Unexpected status response for order {order_id}")
+            return "error"
+        if order_status not in TERMINAL_ORDER_STATUSES:
+            return "pending"
+
+        needs_processing = order_status == "settle_ok"
+        event_id = f"status_poll:{order_id}:{order_status}"
+        try:
+            async with AsyncSessionLocal() as db:
+                stored = await idempotency_service.create_webhook_event(db, WebhookEventCreate(
+                    psp="solidgate",
+                    event_type="order.status_poll",
+                    event_id=event_id,
+                    medusa_order_id=order_id,
+                    processed=not needs_processing,
+                    payload=data,
+                    next_attempt_at=webhook_retry_service.lease_deadline() if needs_processing else None,
+                ))
+                if not stored:
+                    return "duplicate"
+                if not needs_processing:
+                    return "logged"
+
+                error_message = None
+                try:
+                    if not await process_webhook_event(order_id, order_status):
+                        error_message = f"Processing failed for order {order_id}"
+                except Exception as e:
+                    error_message = str(e)
+
+                if error_message:
+                    await webhook_retry_service.record_failure(event_id, error_message, db)
+                    return "failed"
+                await webhook_retry_service.record_success(event_id, db)
+                return "processed"
+        except Exception as e:
+            logger.error(f"Failed to record status poll for order {order_id}: {e}")
+            return "error"
+
+
+solidgate_status_poller = SolidgateStatusPoller()
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    from app.core.database import dispose_engine
+    from app.core.http import http_clients
+    from app.core.redis import redis_client
+
+    await redis_client.connect()
+    await http_clients.connect()
+    try:
+        return await solidgate_status_poller.sweep(max_orders=args.max_orders)
+    finally:
+        await http_clients.disconnect()
+        await redis_client.disconnect()
+        await dispose_engine()
+
+
+if __name__ == "__main__":
+    from app.core.logging_config import setup_logging, shutdown_logging
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-orders", type=int, default=None)
+    setup_logging()
+    try:
+        print(json.dumps(asyncio.run(_main(parser.parse_args())), indent=2))
+    finally:
+        shutdown_logging()
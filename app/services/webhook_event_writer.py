@@ -0,0 +1,101 @@
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud import webhook_events as webhook_events_crud
+from app.schemas.webhook import WebhookEventCreate, WebhookEventResponse
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookEventBatchWriter:
+    """
+    Collects webhook_events inserts for up to WEBHOOK_EVENT_BATCH_MAX_WAIT_MS
+    or WEBHOOK_EVENT_BATCH_MAX_SIZE rows and writes them with one multi-row
+    INSERT ... ON CONFLICT DO NOTHING, so a settlement burst costs one commit
+    per batch instead of one per webhook. Each caller still gets its own
+    inserted row, or None for a duplicate.
+    """
+
+    def __init__(self):
+        self.max_size = settings.WEBHOOK_EVENT_BATCH_MAX_SIZE
+        self.max_wait = settings.WEBHOOK_EVENT_BATCH_MAX_WAIT_MS / 1000
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Webhook event batch writer started")
+
+    async def stop(self) -> None:
+        if not self.is_running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info("Webhook event batch writer stopped")
+
+    async def submit(self, webhook_event: WebhookEventCreate) -> WebhookEventResponse | None:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((webhook_event, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[WebhookEventCreate, asyncio.Future]]) -> None:
+        unique_events: dict[str, WebhookEventCreate] = {}
+        for webhook_event, _ in batch:
+            unique_events.setdefault(webhook_event.event_id, webhook_event)
+
+        try:
+            async with AsyncSessionLocal() as db:
+                inserted = await webhook_events_crud.create_webhook_events_bulk(
+                    db, list(unique_events.values())
+                )
+        except Exception as e:
+            logger.error(f"Failed to write webhook_events batch of {len(batch)}: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for webhook_event, future in batch:
+            if future.done():
+                continue
+            future.set_result(inserted.pop(webhook_event.event_id, None))
+
+        logger.debug(f"Wrote webhook_events batch of {len(batch)}")
+
+
+webhook_event_writer = WebhookEventBatchWriter()
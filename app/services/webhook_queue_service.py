@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+import socket
+
+from app.core.config import settings
+from app.core.logging_config import event_id_var
+from app.core.metrics import observe_stage
+from app.core.redis import redis_client
+from app.services.webhook_retry_service import process_webhook_event, webhook_retry_service
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookQueueService:
+    """
+    Redis Streams backed queue for webhook events.
+
+    The endpoint persists the event and enqueues a reference to it; a pool of
+    workers reads through a consumer group. Unacknowledged entries stay in the
+    group's pending list and are reclaimed by any worker once they have been
+    idle longer than the visibility timeout, so a crashed worker or replica
+    never loses an event. Processing failures are acknowledged and handed to
+    the persistent retry schedule (webhook_retry_service) instead.
+    """
+
+    def __init__(self):
+        self.stream = settings.WEBHOOK_QUEUE_STREAM
+        self.group = settings.WEBHOOK_QUEUE_GROUP
+        self.maxlen = settings.WEBHOOK_QUEUE_MAXLEN
+        self.visibility_timeout_ms = settings.WEBHOOK_QUEUE_VISIBILITY_TIMEOUT * 1000
+        self.max_deliveries = settings.WEBHOOK_QUEUE_MAX_DELIVERIES
+        self.block_ms = settings.WEBHOOK_QUEUE_BLOCK_MS
+        self.concurrency = settings.WEBHOOK_WORKER_CONCURRENCY
+        self.consumer_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._workers: list[asyncio.Task] = []
+        self._running = False
+
+    async def enqueue(self, event_id: str, order_id: str, order_status: str) -> bool:
+        message_id = await redis_client.xadd(
+            self.stream,
+            {
+                "event_id": event_id,
+                "order_id": order_id,
+                "order_status": order_status,
+            },
+            maxlen=self.maxlen,
+        )
+        return message_id is not None
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        if not await redis_client.xgroup_create(self.stream, self.group):
+            logger.error("Webhook queue unavailable, workers not started")
+            return
+
+        self._running = True
+        self._workers = [
+            asyncio.create_task(self._worker(f"{self.consumer_prefix}-{index}"))
+            for index in range(self.concurrency)
+        ]
+        logger.info(f"Started {self.concurrency} webhook workers on {self.stream}")
+
+    async def stop(self) -> None:
+        self._running = False
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Webhook workers stopped")
+
+    async def _worker(self, consumer: str) -> None:
+        while self._running:
+            try:
+                entries = await redis_client.xautoclaim(
+                    self.stream,
+                    self.group,
+                    consumer,
+                    self.visibility_timeout_ms,
+                )
+                reclaimed = bool(entries)
+                if not entries:
+                    entries = await redis_client.xreadgroup(
+                        self.stream,
+                        self.group,
+                        consumer,
+                        block=self.block_ms,
+                    )
+                if not entries and not redis_client.is_connected:
+                    await asyncio.sleep(self.block_ms / 1000)
+                    continue
+
+                for message_id, fields in entries:
+                    await self._handle(message_id, fields, reclaimed)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook worker {consumer} error: {e}")
+                await asyncio.sleep(1)
+
+    async def _handle(self, message_id: str, fields: dict[str, str], reclaimed: bool) -> None:
+        event_id = fields.get("event_id", "")
+        order_id = fields.get("order_id", "")
+        event_id_var.set(event_id)
+
+        if reclaimed:
+            deliveries = await redis_client.xpending_deliveries(self.stream, self.group, message_id)
+            if deliveries > self.max_deliveries:
+                logger.error(f"Webhook event {event_id} exceeded {self.max_deliveries} deliveries, dead-lettering")
+                await webhook_retry_service.dead_letter(event_id, f"Exceeded {self.max_deliveries} deliveries")
+                await redis_client.xack(self.stream, self.group, message_id)
+                return
+
+        error_message = None
+        try:
+            with observe_stage("queue_process"):
+                result = await process_webhook_event(order_id, fields.get("order_status", ""))
+            if not result:
+                error_message = f"Processing failed for order {order_id}"
+        except Exception as e:
+            error_message = str(e)
+
+        if error_message is None:
+            await webhook_retry_service.record_success(event_id)
+        else:
+            await webhook_retry_service.record_failure(event_id, error_message)
+        await redis_client.xack(self.stream, self.group, message_id)
+
+
+webhook_queue_service = WebhookQueueService()
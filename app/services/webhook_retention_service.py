@@ -0,0 +1,159 @@
+import asyncio
+import gzip
+import logging
+import os
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_engine
+from app.crud import webhook_event_partitions as partitions_crud
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_LOCK_KEY = 0x77656268  # "webh"
+
+
+class WebhookRetentionService:
+    """
+    Keeps the monthly webhook_events partitions in shape: creates the current
+    month and WEBHOOK_PARTITION_PREMAKE_MONTHS ahead so inserts never land in
+    the default partition and, when WEBHOOK_RETENTION_MONTHS is set, archives
+    older partitions to gzipped NDJSON in WEBHOOK_ARCHIVE_DIR before
+    detaching and dropping them.
+
+    Retention is opt-in and destructive, so it only runs when the archive
+    directory is configured and already exists (a mounted volume); it is
+    never created on the container's ephemeral filesystem. A
+    transaction-scoped Postgres advisory lock keeps replicas from running
+    maintenance at the same time.
+    """
+
+    def __init__(self):
+        self.premake_months = settings.WEBHOOK_PARTITION_PREMAKE_MONTHS
+        self.retention_months = settings.WEBHOOK_RETENTION_MONTHS
+        self.archive_dir = Path(settings.WEBHOOK_ARCHIVE_DIR) if settings.WEBHOOK_ARCHIVE_DIR else None
+        self.interval = settings.WEBHOOK_MAINTENANCE_INTERVAL
+        self._task: asyncio.Task | None = None
+
+    @property
+    def retention_enabled(self) -> bool:
+        return self.retention_months > 0
+
+    def archive_ready(self) -> bool:
+        return (
+            self.archive_dir is not None
+            and self.archive_dir.is_dir()
+            and os.access(self.archive_dir, os.W_OK)
+        )
+
+    def start(self) -> None:
+        """
+        Runs maintenance every WEBHOOK_MAINTENANCE_INTERVAL. Partitions are
+        always premade; retention only runs when enabled (see run_once).
+        """
+        if self._task is not None:
+            return
+        if self.retention_enabled and not self.archive_ready():
+            logger.error(
+                f"WEBHOOK_RETENTION_MONTHS is set but WEBHOOK_ARCHIVE_DIR ({self.archive_dir}) "
+                "is not an existing writable directory; partitions will not be dropped"
+            )
+        self._task = asyncio.create_task(self._run())
+        logger.info("Webhook partition maintenance started")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("Webhook partition maintenance stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await self._run_once_safely()
+            await asyncio.sleep(self.interval)
+
+    async def _run_once_safely(self) -> None:
+        try:
+            await self.run_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Webhook partition maintenance failed: {e}")
+
+    async def run_once(self, today: date | None = None) -> None:
+        current_month = partitions_crud.month_start(today or datetime.now(timezone.utc).date())
+
+        # The lock lives as long as this transaction, which stays open while
+        # the steps below run on their own sessions
+        async with get_engine().begin() as lock_conn:
+            if not await partitions_crud.try_advisory_xact_lock(lock_conn, MAINTENANCE_LOCK_KEY):
+                logger.debug("Webhook partition maintenance running elsewhere, skipping")
+                return
+            await self.ensure_partitions(current_month)
+            if self.retention_enabled:
+                await self.apply_retention(current_month)
+
+    async def ensure_partitions(self, current_month: date) -> None:
+        async with AsyncSessionLocal() as db:
+            existing = await partitions_crud.list_monthly_partitions(db)
+            for offset in range(self.premake_months + 1):
+                month = partitions_crud.add_months(current_month, offset)
+                if month not in existing:
+                    name = await partitions_crud.create_monthly_partition(db, month)
+                    logger.info(f"Created webhook_events partition {name}")
+
+    async def apply_retention(self, current_month: date) -> None:
+        if not self.archive_ready():
+            logger.error(
+                f"Skipping webhook_events retention: WEBHOOK_ARCHIVE_DIR ({self.archive_dir}) "
+                "is not an existing writable directory"
+            )
+            return
+
+        cutoff = partitions_crud.add_months(current_month, -self.retention_months)
+        async with AsyncSessionLocal() as db:
+            existing = await partitions_crud.list_monthly_partitions(db)
+
+        expired = sorted(month for month in existing if month < cutoff)
+        for month in expired:
+            name = existing[month]
+            rows = await self.archive_partition(name)
+            async with AsyncSessionLocal() as db:
+                await partitions_crud.drop_partition(db, name)
+            logger.info(f"Archived and dropped webhook_events partition {name} ({rows} rows)")
+
+        if expired:
+            async with AsyncSessionLocal() as db:
+                deleted = await partitions_crud.delete_event_keys_before(
+                    db, datetime(cutoff.year, cutoff.month, 1, tzinfo=timezone.utc)
+                )
+            logger.info(f"Pruned {deleted} webhook event keys older than {cutoff.isoformat()}")
+
+    async def archive_partition(self, name: str) -> int:
+        """
+        Writes the partition to <archive_dir>/<name>.ndjson.gz via a temporary
+        file that is only renamed into place once complete, so a crash never
+        leaves a truncated archive that looks finished. Compression and file
+        I/O run in a worker thread.
+        """
+        target = self.archive_dir / f"{name}.ndjson.gz"
+        partial = target.with_suffix(".gz.part")
+
+        archive = await asyncio.to_thread(gzip.open, partial, "wt", encoding="utf-8")
+        rows = 0
+        try:
+            async with AsyncSessionLocal() as db:
+                async for chunk in partitions_crud.stream_partition_rows(db, name):
+                    await asyncio.to_thread(archive.write, "".join(f"{row}\n" for row in chunk))
+                    rows += len(chunk)
+        finally:
+            await asyncio.to_thread(archive.close)
+
+        await asyncio.to_thread(os.replace, partial, target)
+        return rows
+
+
+webhook_retention_service = WebhookRetentionService()
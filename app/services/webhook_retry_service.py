@@ -0,0 +1,172 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logging_config import event_id_var
+from app.core.metrics import WEBHOOK_RESULTS, observe_stage
+from app.crud import webhook_events as webhook_events_crud
+from app.schemas.webhook import WebhookEventDetail
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.medusa_service import medusa_service
+from app.services.order_lanes import order_lanes
+
+logger = logging.getLogger(__name__)
+
+
+async def _process_webhook_event(order_id: str, order_status: str):
+    if order_status == "settle_ok":
+        return await medusa_service.process_settle_ok(order_id)
+    return True
+
+
+async def process_webhook_event(order_id: str, order_status: str):
+    return await order_lanes.run(order_id, _process_webhook_event, order_id, order_status)
+
+
+class WebhookRetryService:
+    """
+    Persistent retry schedule on top of webhook_events.
+
+    Events that need processing are stored with processed=False and a
+    next_attempt_at lease. Every failure bumps `attempts` and pushes
+    next_attempt_at out with exponential backoff and jitter; after
+    WEBHOOK_RETRY_MAX_ATTEMPTS the event is dead-lettered and waits for an
+    admin re-drive. A background scheduler claims due events in bulk and
+    processes them with bounded concurrency.
+    """
+
+    def __init__(self):
+        self.max_attempts = settings.WEBHOOK_RETRY_MAX_ATTEMPTS
+        self.base_delay = settings.WEBHOOK_RETRY_BASE_DELAY
+        self.max_delay = settings.WEBHOOK_RETRY_MAX_DELAY
+        self.lease = settings.WEBHOOK_RETRY_LEASE
+        self.queue_window = settings.WEBHOOK_QUEUE_VISIBILITY_TIMEOUT * settings.WEBHOOK_QUEUE_MAX_DELIVERIES
+        self.poll_interval = settings.WEBHOOK_RETRY_POLL_INTERVAL
+        self.batch_size = settings.WEBHOOK_RETRY_BATCH_SIZE
+        self.concurrency = settings.WEBHOOK_RETRY_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._task: asyncio.Task | None = None
+
+    def lease_deadline(self, queued: bool = False) -> datetime:
+        """
+        next_attempt_at for a freshly stored event: if the process handling
+        it dies before recording a result, the scheduler picks it up once
+        the lease runs out. A queued event stays owned by the queue for as
+        long as it can still be redelivered, so the scheduler does not
+        process it alongside a queue worker.
+        """
+        lease = self.lease
+        if queued:
+            lease = max(lease, self.queue_window)
+        return datetime.now(timezone.utc) + timedelta(seconds=lease)
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Webhook retry scheduler started")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("Webhook retry scheduler stopped")
+
+    @asynccontextmanager
+    async def _session(self, db: AsyncSession | None):
+        if db is not None:
+            yield db
+            return
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    async def record_success(self, event_id: str, db: AsyncSession | None = None) -> None:
+        try:
+            async with self._session(db) as session:
+                await webhook_events_crud.mark_webhook_event_processed(session, event_id)
+        except Exception as e:
+            logger.error(f"Failed to mark webhook event {event_id} processed: {e}")
+
+    async def record_failure(self, event_id: str, error_message: str, db: AsyncSession | None = None) -> None:
+        try:
+            async with self._session(db) as session:
+                webhook_event = await webhook_events_crud.record_webhook_event_failure(
+                    session,
+                    event_id,
+                    error_message,
+                    max_attempts=self.max_attempts,
+                    base_delay=self.base_delay,
+                    max_delay=self.max_delay,
+                )
+        except Exception as e:
+            logger.error(f"Failed to record webhook event {event_id} failure: {e}")
+            return
+
+        if webhook_event is None:
+            return
+        if webhook_event.dead_lettered_at:
+            WEBHOOK_RESULTS.labels(webhook_event.psp, "dead_lettered").inc()
+            logger.error(
+                f"Webhook event {event_id} dead-lettered after {webhook_event.attempts} attempts: {error_message}"
+            )
+        else:
+            WEBHOOK_RESULTS.labels(webhook_event.psp, "retry_scheduled").inc()
+            logger.warning(
+                f"Webhook event {event_id} attempt {webhook_event.attempts} failed, "
+                f"retrying at {webhook_event.next_attempt_at.isoformat()}: {error_message}"
+            )
+
+    async def dead_letter(self, event_id: str, error_message: str) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await webhook_events_crud.dead_letter_webhook_event(db, event_id, error_message)
+        except Exception as e:
+            logger.error(f"Failed to dead-letter webhook event {event_id}: {e}")
+
+    async def run_due(self) -> int:
+        async with AsyncSessionLocal() as db:
+            webhook_events = await webhook_events_crud.claim_due_webhook_events(
+                db, self.batch_size, self.lease
+            )
+        if webhook_events:
+            await asyncio.gather(*(self._retry(webhook_event) for webhook_event in webhook_events))
+        return len(webhook_events)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.run_due()
+                if claimed >= self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook retry scheduler error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _retry(self, webhook_event: WebhookEventDetail) -> None:
+        async with self._semaphore:
+            event_id_var.set(webhook_event.event_id)
+            order_status = webhook_event.payload.get("order", {}).get("status", "")
+            error_message = None
+            try:
+                with observe_stage("retry_process"):
+                    result = await process_webhook_event(webhook_event.medusa_order_id or "", order_status)
+                if not result:
+                    error_message = f"Processing failed for order {webhook_event.medusa_order_id}"
+            except Exception as e:
+                error_message = str(e)
+
+            if error_message is None:
+                WEBHOOK_RESULTS.labels(webhook_event.psp, "retried").inc()
+                await self.record_success(webhook_event.event_id)
+            else:
+                await self.record_failure(webhook_event.event_id, error_message)
+
+
+webhook_retry_service = WebhookRetryService()
@@ -0,0 +1,154 @@
+"""
+Event-loop stall benchmark for webhook logging.
+
+Simulates concurrent webhook handlers logging a realistic Solidgate payload,
+once with the synchronous print() block the handler used to emit and once
+through the queue-based logging pipeline from app.core.logging_config, with
+the handler's own debug line (raw body embedded) and LOG_LEVEL=DEBUG so it is
+actually written.
+stdout is replaced by a pipe drained by a deliberately slow reader, which is
+what a container log driver looks like under load: once the pipe buffer
+fills, every synchronous write blocks the event loop.
+
+    python -m benchmarks.logging_stall --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+import orjson
+
+from benchmarks.stubs import apply_bench_env
+
+apply_bench_env(LOG_LEVEL="DEBUG")
+
+PAYLOAD = {
+    "order": {
+        "order_id": "order_01JBENCHMARK",
+        "amount": 4999,
+        "currency": "USD",
+        "status": "settle_ok",
+        "customer_email": "customer@example.com",
+    },
+    "transaction": {
+        "id": "txn_benchmark",
+        "operation": "settle",
+        "status": "success",
+        "card_token": {"token": "a" * 256},
+    },
+    "transactions": [{"id": f"txn_{i}", "amount": 4999, "status": "success"} for i in range(20)],
+}
+RAW_PAYLOAD = orjson.dumps(PAYLOAD)
+HEADERS = {"solidgate-event-type": "order.updated", "solidgate-event-id": "evt_benchmark"}
+
+
+def print_handler() -> None:
+    print("=" * 80)
+    print("=" * 80)
+    print("=" * 80)
+    print("")
+    print("")
+    print(PAYLOAD)
+    print("")
+    print("")
+    print("=" * 80)
+    print("=" * 80)
+    print("=" * 80)
+    print(f"request.headers.get(solidgate-event-type): {HEADERS['solidgate-event-type']}")
+    print(f"request.headers.get(solidgate-event-id): {HEADERS['solidgate-event-id']}")
+    print("=" * 80)
+    print("=" * 80)
+
+
+def logging_handler(logger: logging.Logger) -> None:
+    logger.debug(
+        "Solidgate webhook received",
+        extra={"event_type": HEADERS["solidgate-event-type"], "payload": orjson.Fragment(RAW_PAYLOAD)},
+    )
+
+
+def redirect_stdout_to_slow_pipe(drain_delay: float) -> None:
+    read_fd, write_fd = os.pipe()
+
+    def drain() -> None:
+        while os.read(read_fd, 65536):
+            time.sleep(drain_delay)
+
+    threading.Thread(target=drain, daemon=True).start()
+    os.dup2(write_fd, sys.stdout.fileno())
+    sys.stdout = open(sys.stdout.fileno(), "w", buffering=1, closefd=False)
+
+
+async def measure(handler, requests: int, concurrency: int) -> dict:
+    lags: list[float] = []
+    running = True
+
+    async def monitor() -> None:
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(max(time.perf_counter() - start - 0.001, 0.0))
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request() -> None:
+        async with semaphore:
+            handler()
+            await asyncio.sleep(0)
+
+    monitor_task = asyncio.create_task(monitor())
+    start = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    running = False
+    await monitor_task
+
+    lags.sort()
+    return {
+        "requests": requests,
+        "elapsed_s": round(elapsed, 4),
+        "stall_total_ms": round(sum(lags) * 1000, 3),
+        "stall_max_ms": round(lags[-1] * 1000, 3) if lags else 0.0,
+        "stall_p99_ms": round(lags[int(len(lags) * 0.99) - 1] * 1000, 3) if lags else 0.0,
+        "stall_mean_ms": round(statistics.fmean(lags) * 1000, 3) if lags else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--drain-delay", type=float, default=0.0005, help="seconds the stdout reader sleeps per 64KB chunk")
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    real_stdout = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    redirect_stdout_to_slow_pipe(args.drain_delay)
+
+    before = asyncio.run(measure(print_handler, args.requests, args.concurrency))
+
+    from app.core.logging_config import setup_logging, shutdown_logging
+
+    setup_logging()
+    logger = logging.getLogger("benchmarks.logging_stall")
+    after = asyncio.run(measure(lambda: logging_handler(logger), args.requests, args.concurrency))
+    shutdown_logging()
+
+    results = {"print": before, "queue_logging": after}
+    rendered = json.dumps(results, indent=2)
+    real_stdout.write(rendered + "\n")
+    real_stdout.flush()
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(rendered)
+
+
+if __name__ == "__main__":
+    main()
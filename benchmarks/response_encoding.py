@@ -0,0 +1,203 @@
+"""
+Response encoding micro-benchmark.
+
+Drives a minimal FastAPI app directly through its ASGI interface (no server,
+no sockets), with one route per encoding path:
+
+- initialize/legacy: PaymentInitializeResponse -> model_dump() ->
+  GenericApiResponse, validated and serialized again by FastAPI;
+- initialize/lean: model_construct() inside a typed envelope, rendered once
+  by its compiled serializer (app.core.responses.model_response);
+- webhook/legacy: parsed body echoed in GenericApiResponse and re-encoded
+  through jsonable_encoder;
+- webhook/lean: raw body bytes embedded as-is (raw_json);
+- webhook/no-echo: WEBHOOK_ECHO_PAYLOAD=false.
+
+Reports CPU time and peak traced allocation per request:
+
+    python -m benchmarks.response_encoding --requests 20000 --transactions 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+import orjson
+
+from benchmarks.stubs import apply_bench_env
+
+apply_bench_env()
+
+INTENT = {"merchant": "bench_merchant", "signature": "s" * 88, "payment_intent": "p" * 1200}
+
+
+def build_webhook(transactions: int) -> bytes:
+    return orjson.dumps({
+        "order": {
+            "order_id": "order_01JBENCHMARK",
+            "amount": 4999,
+            "currency": "USD",
+            "status": "auth_ok",
+            "customer_email": "customer@example.com",
+        },
+        "transaction": {
+            "id": "txn_benchmark",
+            "operation": "auth",
+            "status": "success",
+            "card_token": {"token": "a" * 256},
+        },
+        "transactions": [
+            {"id": f"txn_{i}", "amount": 4999, "status": "success", "created_at": "2026-01-01 00:00:00"}
+            for i in range(transactions)
+        ],
+    })
+
+
+def build_app():
+    from fastapi import APIRouter, FastAPI, Request
+    from fastapi.responses import ORJSONResponse
+
+    from app.core.responses import api_response, model_response, raw_json
+    from app.schemas.common import GenericApiResponse
+    from app.schemas.payment import PaymentInitializeEnvelope, PaymentInitializeRequest, PaymentInitializeResponse
+
+    router = APIRouter(default_response_class=ORJSONResponse)
+
+    @router.post("/initialize/legacy")
+    async def initialize_legacy(payload: PaymentInitializeRequest) -> GenericApiResponse:
+        response_data = PaymentInitializeResponse(session_id=payload.order_id, psp=payload.psp, **INTENT)
+        return GenericApiResponse(
+            success=True,
+            message="Payment intent created successfully",
+            data=response_data.model_dump(),
+        )
+
+    @router.post("/initialize/lean", response_model=PaymentInitializeEnvelope)
+    async def initialize_lean(payload: PaymentInitializeRequest):
+        response_data = PaymentInitializeResponse.model_construct(session_id=payload.order_id, psp=payload.psp, **INTENT)
+        return model_response(PaymentInitializeEnvelope(
+            success=True,
+            message="Payment intent created successfully",
+            data=response_data,
+        ))
+
+    @router.post("/webhook/legacy")
+    async def webhook_legacy(request: Request):
+        body = orjson.loads(await request.body())
+        return GenericApiResponse(success=True, message="solidgate_webhook call success", status_code=201, data=body)
+
+    @router.post("/webhook/lean")
+    async def webhook_lean(request: Request):
+        raw_body = await request.body()
+        orjson.loads(raw_body)
+        return api_response(True, "solidgate_webhook call success", 201, data=raw_json(raw_body))
+
+    @router.post("/webhook/no-echo")
+    async def webhook_no_echo(request: Request):
+        orjson.loads(await request.body())
+        return api_response(True, "solidgate_webhook call success", 201, data=None)
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def call(app, path: str, body: bytes) -> tuple[int, bytes]:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 80),
+    }
+    sent = False
+    status_code = 0
+    chunks: list[bytes] = []
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status_code, b"".join(chunks)
+
+
+async def measure(app, path: str, body: bytes, requests: int) -> dict:
+    for _ in range(200):
+        await call(app, path, body)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, path, body)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    samples = min(requests, 500)
+    tracemalloc.start()
+    peaks = []
+    for _ in range(samples):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await call(app, path, body)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    status_code, response = await call(app, path, body)
+    return {
+        "status": status_code,
+        "response_bytes": len(response),
+        "cpu_us_per_request": round(cpu / requests * 1e6, 2),
+        "wall_us_per_request": round(wall / requests * 1e6, 2),
+        "peak_alloc_bytes_per_request": int(sorted(peaks)[len(peaks) // 2]),
+    }
+
+
+async def run(args) -> dict:
+    app = build_app()
+    initialize_body = json.dumps({
+        "order_id": "order_01JBENCHMARK", "amount": 4999, "currency": "USD", "customer_email": "customer@example.com",
+    }).encode()
+    webhook_body = build_webhook(args.transactions)
+
+    results = {}
+    for name, path, body in (
+        ("initialize/legacy", "/initialize/legacy", initialize_body),
+        ("initialize/lean", "/initialize/lean", initialize_body),
+        ("webhook/legacy", "/webhook/legacy", webhook_body),
+        ("webhook/lean", "/webhook/lean", webhook_body),
+        ("webhook/no-echo", "/webhook/no-echo", webhook_body),
+    ):
+        results[name] = await measure(app, path, body, args.requests)
+
+    for endpoint, lean in (("initialize", "lean"), ("webhook", "lean"), ("webhook", "no-echo")):
+        legacy, faster = results[f"{endpoint}/legacy"], results[f"{endpoint}/{lean}"]
+        faster["cpu_saving_pct"] = round((1 - faster["cpu_us_per_request"] / legacy["cpu_us_per_request"]) * 100, 1)
+        faster["alloc_saving_pct"] = round(
+            (1 - faster["peak_alloc_bytes_per_request"] / legacy["peak_alloc_bytes_per_request"]) * 100, 1
+        ) if legacy["peak_alloc_bytes_per_request"] else 0.0
+    return {"webhook_body_bytes": len(webhook_body), "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--transactions", type=int, default=20, help="transactions in the webhook payload")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Webhook parse benchmark.
+
+Compares, for Solidgate payloads of growing size, the cost of getting the
+routing fields out of a webhook body and preparing its payload for the
+webhook_events insert:
+
+- dict: orjson.loads() into Python objects, chained .get() calls, then
+  json.dumps() for the JSONB bind (the previous path);
+- typed: SolidgateWebhookPayload.model_validate_json(), which skips unknown
+  fields without building objects for them, and the raw body passed to the
+  insert as an orjson.Fragment.
+
+    python -m benchmarks.webhook_parse --transactions 0 20 200 2000
+"""
+
+import argparse
+import json
+import time
+
+import orjson
+
+from benchmarks.stubs import apply_bench_env
+
+apply_bench_env()
+
+
+def build_webhook(transactions: int) -> bytes:
+    return orjson.dumps({
+        "order": {
+            "order_id": "order_01JBENCHMARK",
+            "amount": 4999,
+            "currency": "USD",
+            "status": "settle_ok",
+            "customer_email": "customer@example.com",
+        },
+        "transaction": {
+            "id": "txn_benchmark",
+            "operation": "settle",
+            "status": "success",
+            "card_token": {"token": "a" * 256},
+        },
+        "transactions": {
+            f"txn_{i}": {
+                "id": f"txn_{i}",
+                "amount": 4999,
+                "status": "success",
+                "created_at": "2026-01-01 00:00:00",
+                "card": {"bin": "411111", "brand": "VISA", "country": "USA"},
+            }
+            for i in range(transactions)
+        },
+    })
+
+
+def dict_path(raw_body: bytes) -> tuple:
+    body = orjson.loads(raw_body)
+    order = body.get("order", {})
+    token = body.get("transaction", {}).get("card_token", {}).get("token")
+    return order.get("order_id", ""), order.get("status", ""), token, json.dumps(body)
+
+
+def typed_path(raw_body: bytes) -> tuple:
+    from app.schemas.solidgate import SolidgateWebhookPayload
+
+    webhook = SolidgateWebhookPayload.model_validate_json(raw_body)
+    payload = orjson.Fragment(raw_body)
+    return webhook.order_id, webhook.order_status, webhook.payment_token, orjson.dumps(payload)
+
+
+def measure(func, raw_body: bytes, min_seconds: float) -> float:
+    for _ in range(20):
+        func(raw_body)
+    iterations = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_seconds:
+        func(raw_body)
+        iterations += 1
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, nargs="+", default=[0, 20, 200, 2000])
+    parser.add_argument("--seconds", type=float, default=1.0, help="minimum measuring time per case")
+    args = parser.parse_args()
+
+    results = []
+    for transactions in args.transactions:
+        raw_body = build_webhook(transactions)
+        assert dict_path(raw_body)[:3] == typed_path(raw_body)[:3]
+        dict_us = measure(dict_path, raw_body, args.seconds) * 1e6
+        typed_us = measure(typed_path, raw_body, args.seconds) * 1e6
+        results.append({
+            "transactions": transactions,
+            "body_bytes": len(raw_body),
+            "dict_us": round(dict_us, 2),
+            "typed_us": round(typed_us, 2),
+            "speedup": round(dict_us / typed_us, 2),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
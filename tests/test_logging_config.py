@@ -0,0 +1,27 @@
+import logging
+import queue
+
+import orjson
+
+from app.core.logging_config import JsonFormatter, _PreparedQueueHandler
+
+
+def test_json_formatter_keeps_traceback_prepared_by_queue_handler():
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger = logging.getLogger("tests.logging_config")
+    logger.handlers = [_PreparedQueueHandler(log_queue)]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Webhook error")
+
+    record = log_queue.get_nowait()
+    assert record.exc_info is None
+    entry = orjson.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "Webhook error"
+    assert entry["exc_info"].startswith("Traceback")
+    assert "ValueError: boom" in entry["exc_info"]
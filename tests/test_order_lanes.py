@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.services.order_lanes import OrderLaneDispatcher
+
+
+def test_stop_does_not_hang_on_a_full_lane():
+    async def scenario():
+        lanes = OrderLaneDispatcher()
+        lanes.lane_count = 1
+        lanes.queue_size = 1
+        lanes.shutdown_timeout = 0.1
+        lanes.start()
+
+        blocked = asyncio.Event()
+        running = asyncio.create_task(lanes.run("order_1", blocked.wait))
+        queued = asyncio.create_task(lanes.run("order_1", blocked.wait))
+        await asyncio.sleep(0.01)
+        assert lanes._queues[0].full()
+
+        await asyncio.wait_for(lanes.stop(), timeout=2)
+        assert not lanes.is_running
+        for submitted in (running, queued):
+            with pytest.raises(asyncio.CancelledError):
+                await submitted
+
+    asyncio.run(scenario())
+
+
+def test_stop_drains_backlog_within_timeout():
+    async def scenario():
+        lanes = OrderLaneDispatcher()
+        lanes.lane_count = 2
+        lanes.shutdown_timeout = 1.0
+        lanes.start()
+
+        async def work(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        results = [asyncio.create_task(lanes.run(f"order_{i}", work, i)) for i in range(5)]
+        await asyncio.sleep(0)
+        await lanes.stop()
+        assert await asyncio.gather(*results) == list(range(5))
+
+    asyncio.run(scenario())
@@ -0,0 +1,41 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db_session
+from app.main import app
+from app.services.solidgate_service import solidgate_service
+
+BODY = b'{"order": {"order_id": "order_1", "status": "settle_ok"}}'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    class NoSession:
+        def __getattr__(self, name):
+            raise AssertionError("the database must not be touched")
+
+    async def no_db():
+        yield NoSession()
+
+    def no_parse(raw_body):
+        raise AssertionError("the body must not be parsed")
+
+    monkeypatch.setattr(solidgate_service, "parse_webhook", no_parse)
+    app.dependency_overrides[get_db_session] = no_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("headers", [
+    {},
+    {"solidgate-event-type": "order.updated"},
+    {"solidgate-event-id": "evt_1"},
+    {"solidgate-event-id": "", "solidgate-event-type": "order.updated"},
+])
+def test_missing_event_headers_are_rejected_before_any_work(client, headers):
+    response = client.post("/api/v1/webhooks/solidgate_webhook", content=BODY, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Missing solidgate-event-id or solidgate-event-type header"